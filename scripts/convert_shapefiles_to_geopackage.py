@@ -2,46 +2,140 @@
 
 from __future__ import annotations
 
+import argparse
 import os
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
 
-import geopandas as gpd
+# GDAL reads the SQLite page cache size (in MB) when the GPKG driver opens a
+# file, so it has to be set before geopandas/fiona load GDAL. A larger cache
+# speeds up building the spatial index on write.
+os.environ.setdefault("OGR_SQLITE_CACHE", "512")
+os.environ.setdefault("GDAL_CACHEMAX", "512")
+
+import geopandas as gpd  # noqa: E402
+import pyogrio  # noqa: E402
+import pyproj  # noqa: E402
 
 INPUT_DIR = "30g-01"
 OUTPUT_DIR = "30g-01-geopackages"
+MAX_WORKERS = os.cpu_count()
+
 
+def convert_shapefile(
+    shapefile_path: str, output_path: str, spatial_index: bool = True
+) -> None:
+    """Convert a single shapefile to a GeoPackage.
 
-def convert_shapefile(shapefile_path: str, output_path: str) -> None:
-    """Convert a single shapefile to a GeoPackage."""
+    Building the R-tree spatial index dominates the write time. Pass
+    ``spatial_index=False`` when the GeoPackage is only an intermediate for
+    sequential readers such as PMTiles generation.
+    """
     try:
-        gdf = gpd.read_file(shapefile_path)
+        gdf = gpd.read_file(shapefile_path, engine="pyogrio")
         if os.path.exists(output_path):
             os.remove(output_path)
-        gdf.to_file(output_path, driver="GPKG")
+        gdf.to_file(
+            output_path,
+            driver="GPKG",
+            engine="pyogrio",
+            layer_options={"SPATIAL_INDEX": "YES" if spatial_index else "NO"},
+        )
         print(f"Wrote {output_path}")
     except Exception as exc:
         print(f"Failed to convert {shapefile_path}: {exc}")
 
 
-def convert_directory(input_dir: str, output_dir: str) -> None:
-    """Convert all shapefiles in a directory tree to GeoPackages."""
-    os.makedirs(output_dir, exist_ok=True)
+def iter_shapefiles(directory: str) -> Iterator[str]:
+    """Yield shapefile paths under a directory tree as they are found."""
+    for path in Path(directory).rglob("*"):
+        if path.suffix.lower() == ".shp":
+            yield str(path)
+
 
-    shapefiles = []
-    for root, _, files in os.walk(input_dir):
-        for filename in files:
-            if filename.lower().endswith(".shp"):
-                shapefiles.append(os.path.join(root, filename))
+def _init_worker() -> None:
+    """Register GDAL drivers and open the PROJ database once per worker."""
+    pyogrio.list_drivers()
+    pyproj.CRS.from_epsg(4326)
 
-    print(f"Found {len(shapefiles)} shapefiles to process.")
 
-    for shapefile_path in shapefiles:
+def iter_conversions(input_dir: str, output_dir: str) -> Iterator[tuple[str, str]]:
+    """Yield ``(shapefile, geopackage)`` pairs, one per output path.
+
+    Outputs are named by basename, so shapefiles with the same name in
+    different subdirectories would write the same GeoPackage at once. Only
+    the first one found is converted; later ones are reported and skipped.
+    """
+    claimed_outputs = set()
+    for shapefile_path in iter_shapefiles(input_dir):
         base_name = os.path.splitext(os.path.basename(shapefile_path))[0]
         output_path = os.path.join(output_dir, f"{base_name}.gpkg")
-        convert_shapefile(shapefile_path, output_path)
+        if output_path in claimed_outputs:
+            print(f"Skipping {shapefile_path}: {output_path} is already claimed")
+            continue
+        claimed_outputs.add(output_path)
+        yield shapefile_path, output_path
+
+
+def _convert_one(job: tuple[str, str], spatial_index: bool) -> None:
+    """Convert one ``(shapefile, geopackage)`` pair; runs in a worker process."""
+    shapefile_path, output_path = job
+    convert_shapefile(shapefile_path, output_path, spatial_index)
+
+
+def _finish(futures) -> int:
+    """Re-raise any worker error, as iterating map results did; return the count."""
+    for future in futures:
+        future.result()
+    return len(futures)
+
+
+def convert_directory(
+    input_dir: str,
+    output_dir: str,
+    max_workers: int | None = MAX_WORKERS,
+    spatial_index: bool = True,
+) -> None:
+    """Convert all shapefiles in a directory tree to GeoPackages."""
+    os.makedirs(output_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker
+    ) as executor:
+        # Executor.map walks the whole tree and submits every job up front,
+        # so keep at most two jobs per worker in flight and pull the next
+        # shapefile from the directory walk as each one finishes.
+        max_pending = 2 * (max_workers or os.cpu_count() or 1)
+        pending = set()
+        processed = 0
+        for job in iter_conversions(input_dir, output_dir):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                processed += _finish(done)
+            pending.add(executor.submit(_convert_one, job, spatial_index))
+        processed += _finish(wait(pending).done)
+
+    print(f"Processed {processed} shapefiles.")
 
 
 def main() -> None:
-    convert_directory(INPUT_DIR, OUTPUT_DIR)
+    parser = argparse.ArgumentParser(
+        description="Convert a folder of shapefiles into GeoPackages."
+    )
+    parser.add_argument(
+        "--no-spatial-index",
+        action="store_true",
+        help=(
+            "Skip building the GeoPackage spatial index. Useful when the "
+            "GeoPackages only feed PMTiles generation."
+        ),
+    )
+    args = parser.parse_args()
+
+    convert_directory(
+        INPUT_DIR, OUTPUT_DIR, spatial_index=not args.no_spatial_index
+    )
 
 
 if __name__ == "__main__":
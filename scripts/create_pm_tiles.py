@@ -2,96 +2,125 @@
 
 from __future__ import annotations
 
+import argparse
 import os
-import subprocess
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 
+from osgeo import gdal
 
-def reproject_shapefile(
-    input_path: str, output_path: str, target_srs: str = "EPSG:4326"
-) -> None:
+gdal.UseExceptions()
+
+
+@lru_cache(maxsize=None)
+def _pmtiles_options(min_zoom: int, max_zoom: int, target_srs: str) -> tuple:
     """
-    Reproject a shapefile to a specified spatial reference system.
+    Build the translate options once and share them across conversions.
+
+    ``gdal.VectorTranslateOptions`` returns an ``(options, callback,
+    callback_data)`` tuple, which ``gdal.VectorTranslate`` accepts as is.
     """
-    try:
-        subprocess.run(
-            [
-                "ogr2ogr",
-                "-t_srs",
-                target_srs,
-                "-f",
-                "ESRI Shapefile",
-                output_path,
-                input_path,
-            ],
-            check=True,
-        )
-        print(f"Reprojected shapefile saved at {output_path}")
-    except subprocess.CalledProcessError as exc:
-        print(f"Error reprojecting shapefile {input_path}: {exc}")
+    return gdal.VectorTranslateOptions(
+        format="PMTiles",
+        dstSRS=target_srs,
+        datasetCreationOptions=[f"MINZOOM={min_zoom}", f"MAXZOOM={max_zoom}"],
+    )
 
 
 def convert_shapefile_to_pmtiles(
-    shapefile_path: str, pmtiles_path: str, min_zoom: int = 10, max_zoom: int = 15
+    shapefile_path: str,
+    pmtiles_path: str,
+    min_zoom: int = 10,
+    max_zoom: int = 15,
+    target_srs: str = "EPSG:4326",
 ) -> None:
     """
-    Convert a shapefile to PMTiles format using GDAL's ogr2ogr.
+    Reproject a shapefile and convert it to PMTiles in one VectorTranslate pass.
     """
+    options = _pmtiles_options(min_zoom, max_zoom, target_srs)
     try:
-        subprocess.run(
-            [
-                "ogr2ogr",
-                "-dsco",
-                f"MINZOOM={min_zoom}",
-                "-dsco",
-                f"MAXZOOM={max_zoom}",
-                "-f",
-                "PMTiles",
-                pmtiles_path,
-                shapefile_path,
-            ],
-            check=True,
-        )
+        dataset = gdal.VectorTranslate(pmtiles_path, shapefile_path, options=options)
+        dataset.Close()
         print(f"PMTiles created at {pmtiles_path}")
-    except subprocess.CalledProcessError as exc:
+    except RuntimeError as exc:
         print(f"Error processing {shapefile_path}: {exc}")
 
 
-def create_pmtiles_for_directory(
-    shapefile_dir: str, pmtiles_dir: str, min_zoom: int = 5, max_zoom: int = 12
-) -> None:
+def iter_shapefiles(directory: str) -> Iterator[str]:
     """
-    Scan a directory of shapefiles and generate PMTiles for each.
+    Yield shapefile paths under a directory tree as they are found.
     """
-    os.makedirs(pmtiles_dir, exist_ok=True)
+    for path in Path(directory).rglob("*.shp"):
+        yield str(path)
 
-    shapefiles = []
-    for root, _, files in os.walk(shapefile_dir):
-        for file in files:
-            if file.endswith(".shp"):
-                shapefiles.append(os.path.join(root, file))
 
-    print(f"Found {len(shapefiles)} shapefiles to process.")
+def _pmtiles_path(shapefile_path: str, pmtiles_dir: str) -> str:
+    pmtiles_name = f"{os.path.splitext(os.path.basename(shapefile_path))[0]}.pmtiles"
+    return os.path.join(pmtiles_dir, pmtiles_name)
 
-    for shapefile_path in shapefiles:
-        reprojected_shapefile_path = os.path.join(
-            pmtiles_dir, f"reprojected_{os.path.basename(shapefile_path)}"
-        )
-        pmtiles_name = f"{os.path.splitext(os.path.basename(shapefile_path))[0]}.pmtiles"
-        pmtiles_path = os.path.join(pmtiles_dir, pmtiles_name)
 
-        reproject_shapefile(shapefile_path, reprojected_shapefile_path)
-        convert_shapefile_to_pmtiles(
-            reprojected_shapefile_path, pmtiles_path, min_zoom, max_zoom
-        )
+def create_pmtiles_for_directory(
+    shapefile_dir: str,
+    pmtiles_dir: str,
+    min_zoom: int = 5,
+    max_zoom: int = 12,
+    target_srs: str = "EPSG:4326",
+    jobs: int | None = None,
+) -> None:
+    """
+    Scan a directory of shapefiles and generate PMTiles for each.
+    """
+    os.makedirs(pmtiles_dir, exist_ok=True)
 
-        os.remove(reprojected_shapefile_path)
-        print(f"Deleted temporary file {reprojected_shapefile_path}")
+    # GDAL releases the GIL while translating, so threads are enough to run
+    # conversions concurrently.
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = []
+        # Outputs are named by basename, so shapefiles with the same name in
+        # different subdirectories would write one PMTiles file at once.
+        # Only the first one found is tiled.
+        claimed_outputs = set()
+        for shapefile_path in iter_shapefiles(shapefile_dir):
+            pmtiles_path = _pmtiles_path(shapefile_path, pmtiles_dir)
+            if pmtiles_path in claimed_outputs:
+                print(f"Skipping {shapefile_path}: {pmtiles_path} is already claimed")
+                continue
+            claimed_outputs.add(pmtiles_path)
+            futures.append(
+                executor.submit(
+                    convert_shapefile_to_pmtiles,
+                    shapefile_path,
+                    pmtiles_path,
+                    min_zoom,
+                    max_zoom,
+                    target_srs,
+                )
+            )
+        for future in futures:
+            future.result()
+
+    print(f"Processed {len(futures)} shapefiles.")
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Create PMTiles from a directory of shapefiles."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of concurrent conversions (default: CPU count).",
+    )
+    args = parser.parse_args()
+
     shapefile_directory = "gpkg"
     pmtiles_directory = "pmtiles"
-    create_pmtiles_for_directory(shapefile_directory, pmtiles_directory)
+    create_pmtiles_for_directory(
+        shapefile_directory, pmtiles_directory, jobs=args.jobs
+    )
 
 
 if __name__ == "__main__":
@@ -2,9 +2,16 @@
 
 from __future__ import annotations
 
+import argparse
 import os
-import shutil
-import subprocess
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from osgeo import gdal
+
+gdal.UseExceptions()
 
 INPUT_DIR = "geopackages"
 OUTPUT_DIR = "pmtiles"
@@ -13,6 +20,20 @@ MAX_ZOOM = 12
 TARGET_SRS = "EPSG:4326"
 
 
+@lru_cache(maxsize=None)
+def _pmtiles_options(min_zoom: int, max_zoom: int, target_srs: str) -> tuple:
+    """Build the translate options once and share them across conversions.
+
+    ``gdal.VectorTranslateOptions`` returns an ``(options, callback,
+    callback_data)`` tuple, which ``gdal.VectorTranslate`` accepts as is.
+    """
+    return gdal.VectorTranslateOptions(
+        format="PMTiles",
+        dstSRS=target_srs,
+        datasetCreationOptions=[f"MINZOOM={min_zoom}", f"MAXZOOM={max_zoom}"],
+    )
+
+
 def convert_geopackage_to_pmtiles(
     geopackage_path: str,
     pmtiles_path: str,
@@ -20,66 +41,83 @@ def convert_geopackage_to_pmtiles(
     max_zoom: int,
     target_srs: str,
 ) -> None:
-    """Convert a GeoPackage to PMTiles with ogr2ogr."""
+    """Convert a GeoPackage to PMTiles with GDAL's VectorTranslate."""
+    options = _pmtiles_options(min_zoom, max_zoom, target_srs)
     try:
-        ogr2ogr = shutil.which("ogr2ogr")
-        if not ogr2ogr:
-            raise FileNotFoundError(
-                "ogr2ogr not found in PATH. Install GDAL (e.g. `brew install gdal`) "
-                "or ensure ogr2ogr is on your PATH."
-            )
-        subprocess.run(
-            [
-                ogr2ogr,
-                "-t_srs",
-                target_srs,
-                "-dsco",
-                f"MINZOOM={min_zoom}",
-                "-dsco",
-                f"MAXZOOM={max_zoom}",
-                "-f",
-                "PMTiles",
-                pmtiles_path,
-                geopackage_path,
-            ],
-            check=True,
-        )
+        dataset = gdal.VectorTranslate(pmtiles_path, geopackage_path, options=options)
+        dataset.Close()
         print(f"PMTiles created at {pmtiles_path}")
-    except FileNotFoundError as exc:
-        print(f"Missing dependency while processing {geopackage_path}: {exc}")
-    except subprocess.CalledProcessError as exc:
+    except RuntimeError as exc:
         print(f"Error processing {geopackage_path}: {exc}")
 
 
+def iter_geopackages(directory: str) -> Iterator[str]:
+    """Yield GeoPackage paths under a directory tree as they are found."""
+    for path in Path(directory).rglob("*"):
+        if path.suffix.lower() == ".gpkg":
+            yield str(path)
+
+
+def _pmtiles_path(geopackage_path: str, pmtiles_dir: str) -> str:
+    pmtiles_name = f"{os.path.splitext(os.path.basename(geopackage_path))[0]}.pmtiles"
+    return os.path.join(pmtiles_dir, pmtiles_name)
+
+
 def create_pmtiles_for_directory(
     geopackage_dir: str,
     pmtiles_dir: str,
     min_zoom: int,
     max_zoom: int,
     target_srs: str,
+    jobs: int | None = None,
 ) -> None:
     """Scan a directory of GeoPackages and generate PMTiles for each."""
     os.makedirs(pmtiles_dir, exist_ok=True)
 
-    geopackages = []
-    for root, _, files in os.walk(geopackage_dir):
-        for filename in files:
-            if filename.lower().endswith(".gpkg"):
-                geopackages.append(os.path.join(root, filename))
-
-    print(f"Found {len(geopackages)} GeoPackages to process.")
+    # GDAL releases the GIL while translating, so threads are enough to run
+    # conversions concurrently.
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = []
+        # Outputs are named by basename, so GeoPackages with the same name in
+        # different subdirectories would write one PMTiles file at once.
+        # Only the first one found is tiled.
+        claimed_outputs = set()
+        for geopackage_path in iter_geopackages(geopackage_dir):
+            pmtiles_path = _pmtiles_path(geopackage_path, pmtiles_dir)
+            if pmtiles_path in claimed_outputs:
+                print(f"Skipping {geopackage_path}: {pmtiles_path} is already claimed")
+                continue
+            claimed_outputs.add(pmtiles_path)
+            futures.append(
+                executor.submit(
+                    convert_geopackage_to_pmtiles,
+                    geopackage_path,
+                    pmtiles_path,
+                    min_zoom,
+                    max_zoom,
+                    target_srs,
+                )
+            )
+        for future in futures:
+            future.result()
 
-    for geopackage_path in geopackages:
-        pmtiles_name = f"{os.path.splitext(os.path.basename(geopackage_path))[0]}.pmtiles"
-        pmtiles_path = os.path.join(pmtiles_dir, pmtiles_name)
-        convert_geopackage_to_pmtiles(
-            geopackage_path, pmtiles_path, min_zoom, max_zoom, target_srs
-        )
+    print(f"Processed {len(futures)} GeoPackages.")
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Create PMTiles from a directory of GeoPackages."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of concurrent conversions (default: CPU count).",
+    )
+    args = parser.parse_args()
+
     create_pmtiles_for_directory(
-        INPUT_DIR, OUTPUT_DIR, MIN_ZOOM, MAX_ZOOM, TARGET_SRS
+        INPUT_DIR, OUTPUT_DIR, MIN_ZOOM, MAX_ZOOM, TARGET_SRS, jobs=args.jobs
     )
 
 
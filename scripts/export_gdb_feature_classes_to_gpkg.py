@@ -11,10 +11,19 @@ from __future__ import annotations
 import argparse
 import os
 import re
-import shutil
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import List, Optional
+
+# The GeoPackages are derived from the source GDB and can always be exported
+# again, so trade SQLite durability for write speed.
+GPKG_WRITE_CONFIG = {
+    "GDAL_NUM_THREADS": "ALL_CPUS",
+    "OGR_SQLITE_SYNCHRONOUS": "OFF",
+    "OGR_SQLITE_JOURNAL": "MEMORY",
+}
+# Rows per SQLite transaction (ogr2ogr -gt).
+TRANSACTION_SIZE = 65536
 
 
 def _sanitize_filename(name: str) -> str:
@@ -53,25 +62,34 @@ def _list_feature_layers(gdb_path: Path) -> List[str]:
     return layers
 
 
-def _build_ogr2ogr_command(gdb_path: Path, layer_name: str, output_gpkg: Path, overwrite: bool) -> List[str]:
+def _build_translate_options(layer_name: str, overwrite: bool):
+    from osgeo import gdal  # type: ignore
+
     escaped_layer_name = layer_name.replace('"', '""')
     sql = f'SELECT * FROM "{escaped_layer_name}"'
-    cmd = [
-        "ogr2ogr",
-        "-f",
-        "GPKG",
-        str(output_gpkg),
-        str(gdb_path),
-        "-dialect",
-        "OGRSQL",
-        "-sql",
-        sql,
-        "-nln",
-        layer_name,
-    ]
-    if overwrite:
-        cmd.insert(1, "-overwrite")
-    return cmd
+    return gdal.VectorTranslateOptions(
+        format="GPKG",
+        SQLStatement=sql,
+        SQLDialect="OGRSQL",
+        layerName=layer_name,
+        accessMode="overwrite" if overwrite else None,
+        transactionSize=TRANSACTION_SIZE,
+    )
+
+
+def _export_layer(gdb_path: Path, output_gpkg: Path, options) -> Optional[str]:
+    """Run VectorTranslate in-process and return an error message on failure."""
+    from osgeo import gdal  # type: ignore
+
+    try:
+        with gdal.config_options(GPKG_WRITE_CONFIG):
+            dataset = gdal.VectorTranslate(
+                str(output_gpkg), str(gdb_path), options=options
+            )
+            dataset.Close()
+    except RuntimeError as exc:
+        return str(exc)
+    return None
 
 
 def main() -> int:
@@ -88,11 +106,14 @@ def main() -> int:
         action="store_true",
         help="Overwrite existing output .gpkg files",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of concurrent layer exports (default: min(8, CPU count))",
+    )
     args = parser.parse_args()
 
-    if shutil.which("ogr2ogr") is None:
-        raise SystemExit("`ogr2ogr` is not installed or not on PATH.")
-
     gdb_path = Path(args.gdb).expanduser().resolve()
     if not gdb_path.exists():
         raise SystemExit(f"GDB path does not exist: {gdb_path}")
@@ -112,25 +133,44 @@ def main() -> int:
     skipped = 0
     failed = 0
 
+    exports = []
+    claimed_outputs = set()
     for layer_name in layer_names:
         output_gpkg = out_dir / f"{_sanitize_filename(layer_name)}.gpkg"
 
-        if output_gpkg.exists() and not args.overwrite:
-            print(f"SKIP (exists): {output_gpkg}")
+        # Exports run concurrently, so two layers whose names sanitize to the
+        # same file must not both write it.
+        if output_gpkg in claimed_outputs:
+            print(f"SKIP (duplicate output): {layer_name} -> {output_gpkg}")
             skipped += 1
             continue
 
-        cmd = _build_ogr2ogr_command(gdb_path, layer_name, output_gpkg, args.overwrite)
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"FAIL: {layer_name} -> {output_gpkg}")
-            if result.stderr.strip():
-                print(result.stderr.strip())
-            failed += 1
+        if output_gpkg.exists() and not args.overwrite:
+            print(f"SKIP (exists): {output_gpkg}")
+            skipped += 1
             continue
 
-        print(f"OK: {layer_name} -> {output_gpkg}")
-        total += 1
+        options = _build_translate_options(layer_name, args.overwrite)
+        exports.append((layer_name, output_gpkg, options))
+        claimed_outputs.add(output_gpkg)
+
+    jobs = args.jobs or min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(_export_layer, gdb_path, output_gpkg, options)
+            for _, output_gpkg, options in exports
+        ]
+        for (layer_name, output_gpkg, _), future in zip(exports, futures):
+            error = future.result()
+            if error is not None:
+                print(f"FAIL: {layer_name} -> {output_gpkg}")
+                if error.strip():
+                    print(error.strip())
+                failed += 1
+                continue
+
+            print(f"OK: {layer_name} -> {output_gpkg}")
+            total += 1
 
     print(f"Done. exported={total} skipped={skipped} failed={failed}")
     return 1 if failed else 0
@@ -1,60 +1,94 @@
 import argparse
 import csv
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-import xml.etree.ElementTree as ET
+
+from lxml import etree
 
 INPUT_PATH = "blt_fgdc"
 OUTPUT_DIR = "blt_fgdc"
 SUFFIX = "_attributes.csv"
 
 
+_WHITESPACE = re.compile(r"\s+")
+# False when an <attr> has no label, definition, source, or domain text at
+# all, so blank elements are skipped before any text is extracted.
+_HAS_ATTR_CONTENT = etree.XPath(
+    "boolean(*[local-name()='attrlabl' or local-name()='attrdef'"
+    " or local-name()='attrdefs' or local-name()='attrdomv'][normalize-space()])"
+)
+
+
+def _normalize_space(text):
+    return _WHITESPACE.sub(" ", text).strip()
+
+
 def _text_or_empty(elem):
-    if elem is None or elem.text is None:
+    if elem is None or not elem.text:
         return ""
-    return " ".join(elem.text.split())
+    return _normalize_space(elem.text)
 
 
 def _collect_domain_text(attr_elem):
-    attrdomv = attr_elem.find("attrdomv")
+    attrdomv = attr_elem.find("{*}attrdomv")
     if attrdomv is None:
         return ""
 
-    pieces = []
-    for node in attrdomv.iter():
-        if node is attrdomv:
-            continue
-        if node.text and node.text.strip():
-            pieces.append(" ".join(node.text.split()))
+    pieces = [
+        _normalize_space(node.text)
+        for node in attrdomv.iterdescendants(etree.Element)
+        if node.text and node.text.strip()
+    ]
+    return " | ".join(dict.fromkeys(pieces))
 
-    seen = set()
-    unique_pieces = []
-    for piece in pieces:
-        if piece not in seen:
-            unique_pieces.append(piece)
-            seen.add(piece)
 
-    return " | ".join(unique_pieces)
+def _attribute_row(attr):
+    if not _HAS_ATTR_CONTENT(attr):
+        return None
 
+    label = _text_or_empty(attr.find("{*}attrlabl"))
+    definition = _text_or_empty(attr.find("{*}attrdef"))
+    source = _text_or_empty(attr.find("{*}attrdefs"))
+    domain = _collect_domain_text(attr)
+    # The XPath test reads whole string values, while the row reads only
+    # .text, so content held in nested markup can still leave every column
+    # blank.
+    if not any([label, definition, source, domain]):
+        return None
+    return [label, definition, source, domain]
 
-def extract_attributes(xml_path):
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
 
-    for elem in root.iter():
-        if "}" in elem.tag:
-            elem.tag = elem.tag.split("}", 1)[1]
+def extract_attributes(xml_path):
+    # Stream <attr> elements so only one attribute is held in memory at a time.
+    # Comments and processing instructions are dropped, as ElementTree did,
+    # so they cannot split an element's .text.
+    context = etree.iterparse(
+        str(xml_path),
+        events=("end",),
+        tag="{*}attr",
+        remove_comments=True,
+        remove_pis=True,
+    )
 
     rows = []
-    for attr in root.findall(".//attr"):
-        label = _text_or_empty(attr.find("attrlabl"))
-        definition = _text_or_empty(attr.find("attrdef"))
-        source = _text_or_empty(attr.find("attrdefs"))
-        domain = _collect_domain_text(attr)
-
-        if not any([label, definition, source, domain]):
+    for _, attr in context:
+        # CSDGM allows an <attr> inside an enumerated domain. Nested ones are
+        # left intact until their outermost <attr> ends, so the outer domain
+        # keeps their text and rows stay in document order.
+        if next(attr.iterancestors("{*}attr"), None) is not None:
             continue
 
-        rows.append([label, definition, source, domain])
+        for nested in attr.iter("{*}attr"):
+            row = _attribute_row(nested)
+            if row is not None:
+                rows.append(row)
+
+        attr.clear()
+        while attr.getprevious() is not None:
+            del attr.getparent()[0]
 
     return rows
 
@@ -83,6 +117,14 @@ def write_csv(rows, output_path):
         writer.writerows(rows)
 
 
+def _process_one(xml_path, output_dir, suffix):
+    rows = extract_attributes(xml_path)
+    output_base = xml_path.stem + suffix
+    csv_path = (output_dir or xml_path.parent) / output_base
+    write_csv(rows, csv_path)
+    return len(rows), csv_path
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Extract FGDC attribute tables from XML metadata."
@@ -121,12 +163,17 @@ def main():
 
     output_dir = Path(output_dir_value) if output_dir_value else None
 
-    for xml_path in xml_files:
-        rows = extract_attributes(xml_path)
-        output_base = xml_path.stem + args.suffix
-        csv_path = (output_dir or xml_path.parent) / output_base
-        write_csv(rows, csv_path)
-        print(f"Wrote {len(rows)} rows to {csv_path}")
+    chunksize = max(1, len(xml_files) // ((os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(
+            _process_one,
+            xml_files,
+            repeat(output_dir),
+            repeat(args.suffix),
+            chunksize=chunksize,
+        )
+        for row_count, csv_path in results:
+            print(f"Wrote {row_count} rows to {csv_path}")
 
 
 if __name__ == "__main__":
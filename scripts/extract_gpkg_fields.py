@@ -2,13 +2,13 @@
 
 from __future__ import annotations
 
+import csv
 import logging
 import os
 import sqlite3
-
-import fiona
-import geopandas as gpd
-import pandas as pd
+from collections.abc import Iterator
+from contextlib import closing
+from pathlib import Path
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
@@ -28,73 +28,106 @@ INPUT_DIR = "mke-ubl"
 OUTPUT_DIR = "mke-ubl/data_dictionaries"
 
 
-def get_gpkg_identifier(filepath: str) -> str:
-    try:
-        with sqlite3.connect(filepath) as conn:
-            cursor = conn.execute(
-                "SELECT identifier FROM gpkg_contents WHERE identifier IS NOT NULL LIMIT 1"
-            )
-            row = cursor.fetchone()
-            return row[0] if row else ""
-    except Exception as exc:
-        logging.warning("Could not read gpkg_contents in %s: %s", filepath, exc)
-        return ""
+def iter_geopackages(directory: str) -> Iterator[str]:
+    """Yield GeoPackage paths under a directory tree as they are found."""
+    for path in Path(directory).rglob("*"):
+        if path.suffix.lower() == ".gpkg":
+            yield str(path)
 
 
-def extract_gpkg_fields(input_dir: str, output_dir: str) -> None:
-    os.makedirs(output_dir, exist_ok=True)
+def connect_readonly(filepath: str) -> sqlite3.Connection:
+    uri = f"{Path(filepath).resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    conn.execute("PRAGMA query_only=ON")
+    return conn
 
-    for root, _, files in os.walk(input_dir):
-        for filename in files:
-            if not filename.lower().endswith(".gpkg"):
-                continue
 
-            filepath = os.path.join(root, filename)
-            output_name = f"{os.path.splitext(filename)[0]}_fields.csv"
-            output_path = os.path.join(output_dir, output_name)
-            friendlier_id = get_gpkg_identifier(filepath)
+def get_gpkg_identifier(conn: sqlite3.Connection) -> str:
+    cursor = conn.execute(
+        "SELECT identifier FROM gpkg_contents WHERE identifier IS NOT NULL LIMIT 1"
+    )
+    row = cursor.fetchone()
+    return row[0] if row else ""
 
-            try:
-                layers = fiona.listlayers(filepath)
-            except Exception as exc:
-                logging.warning("Could not list layers for %s: %s", filepath, exc)
-                continue
 
-            if not layers:
-                logging.warning("No layers found in %s", filepath)
-                continue
+def list_gpkg_layers(conn: sqlite3.Connection) -> list[str]:
+    cursor = conn.execute(
+        "SELECT table_name FROM gpkg_contents "
+        "WHERE data_type IN ('features', 'attributes') ORDER BY rowid"
+    )
+    return [row[0] for row in cursor]
 
-            field_rows: list[dict[str, str]] = []
-            for layer in layers:
+
+def list_layer_fields(conn: sqlite3.Connection, layer: str) -> list[tuple[str, str]]:
+    """Return ``(name, declared type)`` for each column except the integer fid."""
+    escaped_layer = layer.replace('"', '""')
+    fields = []
+    for _, name, declared_type, _, _, pk in conn.execute(
+        f'PRAGMA table_info("{escaped_layer}")'
+    ):
+        if pk and declared_type.upper() == "INTEGER":
+            continue
+        fields.append((name, declared_type))
+    return fields
+
+
+def extract_gpkg_fields(input_dir: str, output_dir: str) -> None:
+    os.makedirs(output_dir, exist_ok=True)
+
+    for filepath in iter_geopackages(input_dir):
+        filename = os.path.basename(filepath)
+        output_name = f"{os.path.splitext(filename)[0]}_fields.csv"
+        output_path = os.path.join(output_dir, output_name)
+
+        try:
+            with closing(connect_readonly(filepath)) as conn:
                 try:
-                    gdf = gpd.read_file(filepath, layer=layer)
-                except Exception as exc:
+                    friendlier_id = get_gpkg_identifier(conn)
+                except sqlite3.Error as exc:
                     logging.warning(
-                        "Could not read layer %s in %s: %s", layer, filepath, exc
-                    )
-                    continue
-
-                for column in gdf.columns:
-                    field_rows.append(
-                        {
-                            "friendlier_id": friendlier_id,
-                            "field_name": column,
-                            "field_type": str(gdf[column].dtype),
-                            "values": "",
-                            "definition": "",
-                            "definition_source": "",
-                            "parent_field_name": "",
-                            "position": "",
-                        }
+                        "Could not read gpkg_contents in %s: %s", filepath, exc
                     )
-
-            if not field_rows:
-                logging.warning("No fields extracted from %s", filepath)
-                continue
-
-            field_df = pd.DataFrame(field_rows, columns=OUTPUT_COLUMNS)
-            field_df.to_csv(output_path, index=False)
-            logging.info("Wrote %s", output_path)
+                    friendlier_id = ""
+
+                layers = list_gpkg_layers(conn)
+                layer_fields = {
+                    layer: list_layer_fields(conn, layer) for layer in layers
+                }
+        except sqlite3.Error as exc:
+            logging.warning("Could not list layers for %s: %s", filepath, exc)
+            continue
+
+        if not layers:
+            logging.warning("No layers found in %s", filepath)
+            continue
+
+        field_rows: list[dict[str, str]] = []
+        for layer in layers:
+            for column, field_type in layer_fields[layer]:
+                field_rows.append(
+                    {
+                        "friendlier_id": friendlier_id,
+                        "field_name": column,
+                        "field_type": field_type,
+                        "values": "",
+                        "definition": "",
+                        "definition_source": "",
+                        "parent_field_name": "",
+                        "position": "",
+                    }
+                )
+
+        if not field_rows:
+            logging.warning("No fields extracted from %s", filepath)
+            continue
+
+        with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(OUTPUT_COLUMNS)
+            writer.writerows(
+                [[row[column] for column in OUTPUT_COLUMNS] for row in field_rows]
+            )
+        logging.info("Wrote %s", output_path)
 
 
 def main() -> None:
@@ -2,16 +2,22 @@
 
 from __future__ import annotations
 
+import csv
 import logging
 import os
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
+import pyogrio
 import rasterio
+import shapely
+from pyproj import CRS, Transformer
 from rasterio.warp import transform_bounds
-from shapely.geometry import MultiPolygon, Polygon
-from shapely.ops import transform
+from shapely.geometry import MultiPolygon, Polygon, box
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
@@ -28,6 +34,41 @@ column_mapping = {
     "folder_size": "File Size",
 }
 
+# Row fields in output column order.
+METADATA_FIELDS = [
+    "filename",
+    "folder_name",
+    "crs",
+    "file_format",
+    "geometry_type",
+    "bounding_box",
+    "spatial_resolution",
+    "folder_size",
+    "wkt_outline",
+]
+
+# Final CSV headers, in the same order as METADATA_FIELDS.
+OUTPUT_COLUMNS = [column_mapping[field] for field in METADATA_FIELDS]
+
+VECTOR_FORMATS = {
+    ".shp": "Shapefile",
+    ".geojson": "GeoJSON",
+}
+
+# GDAL settings for opening rasters only to read their headers. Skipping the
+# directory listing avoids rescanning large folders for every file; sidecars
+# such as .tfw or .aux.xml are still found by probing for them directly.
+RASTER_OPEN_OPTIONS = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "YES",
+    "GDAL_INGESTED_BYTES_AT_OPEN": 16384,
+}
+
+# Number of finished rows buffered before they are written to the CSV.
+WRITE_BATCH_SIZE = 256
+
+# Name pandas gives the dtype of a text column, e.g. "object" or "str".
+STRING_DTYPE = str(pd.Series(dtype="str").dtype)
+
 # Define global variables for the script
 root_directory = "mpls2015"
 output_csv = "mpls.csv"
@@ -41,6 +82,19 @@ include_wkt = True
 # Define the output directory for the attribute table CSV files
 output_directory = "data_dictionaries"
 
+# Layers with more features than this are unioned in chunks of
+# UNION_CHUNK_SIZE first, which is much faster than one large union.
+UNION_CHUNK_THRESHOLD = 500
+UNION_CHUNK_SIZE = 256
+
+# coverage_is_valid and coverage_simplify need shapely 2.1 built against
+# GEOS 3.12; without them every layer takes the general union path.
+COVERAGE_FUNCTIONS_AVAILABLE = (
+    hasattr(shapely, "coverage_is_valid")
+    and hasattr(shapely, "coverage_simplify")
+    and shapely.geos_version >= (3, 12, 0)
+)
+
 
 def get_folder_size(folder_path: str, unit: str = "MB", decimal_places: int = 3) -> float:
     """
@@ -100,31 +154,112 @@ def round_coordinates(geometry, decimal_places: int = 2):
     if geometry.is_empty:
         return geometry
 
-    def rounder(x, y, z=None):
-        if z is None:
-            return (round(x, decimal_places), round(y, decimal_places))
-        return (round(x, decimal_places), round(y, decimal_places), round(z, decimal_places))
+    # Round every vertex in one vectorized pass rather than calling back into
+    # Python for each coordinate.
+    return shapely.transform(
+        geometry,
+        lambda coords: np.round(coords, decimal_places),
+        include_z=geometry.has_z,
+    )
 
-    return transform(rounder, geometry)
 
+@lru_cache(maxsize=64)
+def _cached_transformer(src_wkt: str, dst: str) -> Transformer:
+    """
+    Build a Transformer once per source CRS instead of once per to_crs call.
+    """
+    return Transformer.from_crs(src_wkt, dst, always_xy=True)
 
-def calculate_bounding_box(gdf, decimal_places: int = 4) -> str:
+
+def to_wgs84(gdf):
     """
-    Calculate and format the bounding box for a GeoDataFrame in WGS84 (EPSG:4326).
+    Reproject a GeoDataFrame to WGS84 (EPSG:4326) using a cached Transformer.
     """
-    if gdf.empty or gdf.crs is None:
-        return "Unknown"
+    if gdf.crs.to_epsg() == 4326:
+        return gdf
+    transformer = _cached_transformer(gdf.crs.to_wkt(), "EPSG:4326")
+    geometry = shapely.transform(
+        gdf.geometry.values, transformer.transform, interleaved=False
+    )
+    return gdf.set_geometry(
+        gpd.GeoSeries(geometry, index=gdf.index, crs="EPSG:4326")
+    )
+
+
+def format_bounding_box(bounds, decimal_places: int = 4) -> str:
+    """
+    Format (minx, miny, maxx, maxy) as a comma-separated bounding box string.
+    """
+    rounded_bounds = np.round(np.asarray(bounds, dtype=float), decimal_places)
+    return ",".join(map(str, rounded_bounds.tolist()))
 
-    try:
-        gdf = gdf.to_crs(epsg=4326)
-        bounds = gdf.total_bounds
-        rounded_bounds = [round(coord, decimal_places) for coord in bounds]
-        return (
-            f"{rounded_bounds[0]},{rounded_bounds[1]},"
-            f"{rounded_bounds[2]},{rounded_bounds[3]}"
-        )
-    except Exception:
-        return "Unknown"
+
+def _densify_edges(bounds: np.ndarray, densify_pts: int = 21):
+    """
+    Sample points along the four edges of each (minx, miny, maxx, maxy) row.
+    """
+    minx, miny, maxx, maxy = (bounds[:, [i]] for i in range(4))
+    steps = np.linspace(0.0, 1.0, densify_pts + 2)
+    xs = np.hstack(
+        [
+            minx + (maxx - minx) * steps,
+            np.broadcast_to(maxx, (len(bounds), steps.size)),
+            maxx - (maxx - minx) * steps,
+            np.broadcast_to(minx, (len(bounds), steps.size)),
+        ]
+    )
+    ys = np.hstack(
+        [
+            np.broadcast_to(miny, (len(bounds), steps.size)),
+            miny + (maxy - miny) * steps,
+            np.broadcast_to(maxy, (len(bounds), steps.size)),
+            maxy - (maxy - miny) * steps,
+        ]
+    )
+    return xs, ys
+
+
+def reproject_bounding_boxes(rows: list[dict], decimal_places: int = 4) -> None:
+    """
+    Fill in "Bounding Box" for rows that carry a native-CRS extent.
+
+    Workers report each layer's extent in its source CRS; here extents are
+    grouped by CRS and every group is reprojected with a single Transformer
+    call instead of one call per file.
+    """
+    groups: dict[str, list[tuple[dict, tuple]]] = {}
+    for row in rows:
+        source_extent = row.pop("source_extent", None)
+        if source_extent is not None:
+            crs_wkt, bounds = source_extent
+            groups.setdefault(crs_wkt, []).append((row, bounds))
+
+    for crs_wkt, members in groups.items():
+        bounds = np.array([member_bounds for _, member_bounds in members], dtype=float)
+        try:
+            xs, ys = _densify_edges(bounds)
+            transformer = _cached_transformer(crs_wkt, "EPSG:4326")
+            tx, ty = transformer.transform(xs.ravel(), ys.ravel())
+            tx = np.where(np.isfinite(tx), tx, np.nan).reshape(xs.shape)
+            ty = np.where(np.isfinite(ty), ty, np.nan).reshape(ys.shape)
+            with np.errstate(all="ignore"):
+                reprojected = np.column_stack(
+                    [
+                        np.nanmin(tx, axis=1),
+                        np.nanmin(ty, axis=1),
+                        np.nanmax(tx, axis=1),
+                        np.nanmax(ty, axis=1),
+                    ]
+                )
+        except Exception as exc:
+            logging.error("Could not reproject bounding boxes to EPSG:4326: %s", exc)
+            reprojected = np.full((len(members), 4), np.nan)
+
+        for (row, _), row_bounds in zip(members, reprojected):
+            if np.isfinite(row_bounds).all():
+                row["Bounding Box"] = format_bounding_box(row_bounds, decimal_places)
+            else:
+                row["Bounding Box"] = "Unknown"
 
 
 def calculate_bounding_box_raster(src, decimal_places: int = 4) -> tuple[str, str]:
@@ -136,24 +271,14 @@ def calculate_bounding_box_raster(src, decimal_places: int = 4) -> tuple[str, st
 
     try:
         left, bottom, right, top = src.bounds
-        if src.crs.to_string() != "EPSG:4326":
+        if src.crs.to_epsg() != 4326:
             left, bottom, right, top = transform_bounds(
-                src.crs, "EPSG:4326", left, bottom, right, top
+                src.crs, "EPSG:4326", left, bottom, right, top, densify_pts=21
             )
 
-        rounded_bounds = [round(coord, decimal_places) for coord in [left, bottom, right, top]]
-        bbox_str = (
-            f"{rounded_bounds[0]},{rounded_bounds[1]},"
-            f"{rounded_bounds[2]},{rounded_bounds[3]}"
-        )
-
-        wkt_outline = (
-            f"POLYGON(({rounded_bounds[0]} {rounded_bounds[1]}, "
-            f"{rounded_bounds[0]} {rounded_bounds[3]}, "
-            f"{rounded_bounds[2]} {rounded_bounds[3]}, "
-            f"{rounded_bounds[2]} {rounded_bounds[1]}, "
-            f"{rounded_bounds[0]} {rounded_bounds[1]}))"
-        )
+        rounded_bounds = np.round([left, bottom, right, top], decimal_places)
+        bbox_str = format_bounding_box(rounded_bounds, decimal_places)
+        wkt_outline = box(*rounded_bounds, ccw=False).wkt
 
         return bbox_str, wkt_outline
     except Exception as exc:
@@ -161,26 +286,89 @@ def calculate_bounding_box_raster(src, decimal_places: int = 4) -> tuple[str, st
         return "Unknown", "None"
 
 
-def generate_wkt_outline(gdf, decimal_places: int = 2) -> str:
+def union_geometries(geometries):
     """
-    Generate a WKT representation of a generalized outline for the dataset.
+    Union an array of geometries, merging chunks first for large inputs.
     """
-    if gdf.empty or gdf.crs is None:
-        return "missing CRS"
+    if len(geometries) <= UNION_CHUNK_THRESHOLD:
+        return shapely.union_all(geometries)
+
+    partials = [
+        shapely.union_all(geometries[start : start + UNION_CHUNK_SIZE])
+        for start in range(0, len(geometries), UNION_CHUNK_SIZE)
+    ]
+    return shapely.union_all(partials)
+
+
+def is_polygon_coverage(geometries) -> bool:
+    """
+    Return True if the geometries are polygons forming a valid coverage.
+
+    A coverage has no overlaps and neighbouring polygons share identical
+    edges, which lets the faster coverage_* functions be used on it.
+    """
+    if not COVERAGE_FUNCTIONS_AVAILABLE:
+        return False
+    polygonal = np.isin(shapely.get_type_id(geometries), (3, 6))
+    return bool(polygonal.all()) and bool(shapely.coverage_is_valid(geometries))
 
+
+def union_coverage(geometries):
+    """
+    Union a polygon coverage, falling back to a general union if GEOS rejects it.
+    """
     try:
-        global simplify_tolerance
+        return shapely.coverage_union_all(geometries)
+    except shapely.errors.GEOSException as exc:
+        logging.info("Coverage union failed (%s); using a full union.", exc)
+        return union_geometries(geometries)
 
-        gdf = gdf.to_crs(epsg=4326)
-        logging.info("Converted GeoDataFrame to EPSG:4326.")
 
-        unified_geom = gdf.geometry.union_all()
+def generate_wkt_outline(
+    gdf, decimal_places: int = 2, simplify_tolerance: float | None = None
+) -> str:
+    """
+    Generate a WKT outline for a GeoDataFrame that is already in EPSG:4326.
+    """
+    if gdf.empty or gdf.crs is None:
+        return "missing CRS"
+
+    try:
+        geometries = gdf.geometry.to_numpy()
+        polygonal = np.isin(shapely.get_type_id(geometries), (3, 6)).all()
+        if simplify_tolerance is not None and polygonal:
+            minx, miny, maxx, maxy = gdf.total_bounds
+            if max(maxx - minx, maxy - miny) < 2 * simplify_tolerance:
+                # Simplifying would leave little more than the extent, so
+                # skip the union and publish the bounding box instead.
+                logging.info("Extent is within the simplify tolerance; using bbox.")
+                outline = round_coordinates(box(minx, miny, maxx, maxy), decimal_places)
+                return outline.wkt
+
+        if len(geometries) == 1 and polygonal:
+            # A single polygon needs no union; it is only simplified below.
+            unified_geom = geometries[0]
+        elif polygonal and is_polygon_coverage(geometries):
+            # Simplifying features one by one would pull shared edges apart
+            # and leave slivers, but coverage_simplify keeps neighbouring
+            # edges identical, so the coverage can be thinned before the union.
+            if simplify_tolerance is not None:
+                geometries = shapely.coverage_simplify(geometries, simplify_tolerance)
+            unified_geom = union_coverage(geometries)
+        else:
+            unified_geom = union_geometries(geometries)
         logging.info("Unified geometry type: %s", type(unified_geom))
 
-        num_vertices_before = count_vertices(unified_geom)
-        logging.info("Number of vertices before simplification: %s", num_vertices_before)
+        # Vertex counts are only for the log, so skip them when it is quiet.
+        log_vertices = logging.getLogger().isEnabledFor(logging.INFO)
+        if log_vertices:
+            logging.info(
+                "Number of vertices before simplification: %s",
+                count_vertices(unified_geom),
+            )
 
         if simplify_tolerance is not None:
+            # A final pass cleans up the seams left between simplified features.
             generalized_outline = unified_geom.simplify(
                 simplify_tolerance, preserve_topology=True
             )
@@ -188,8 +376,11 @@ def generate_wkt_outline(gdf, decimal_places: int = 2) -> str:
         else:
             generalized_outline = unified_geom
 
-        num_vertices_after = count_vertices(generalized_outline)
-        logging.info("Number of vertices after simplification: %s", num_vertices_after)
+        if log_vertices:
+            logging.info(
+                "Number of vertices after simplification: %s",
+                count_vertices(generalized_outline),
+            )
 
         generalized_outline = round_coordinates(generalized_outline, decimal_places)
         logging.info("Rounded coordinates of the generalized outline.")
@@ -211,13 +402,11 @@ def count_vertices(geometry) -> int:
     """
     Count the number of vertices in a geometry.
     """
-    if geometry.is_empty:
+    if geometry.is_empty or not isinstance(geometry, (Polygon, MultiPolygon)):
         return 0
-    if isinstance(geometry, Polygon):
-        return len(geometry.exterior.coords)
-    if isinstance(geometry, MultiPolygon):
-        return sum(len(polygon.exterior.coords) for polygon in geometry.geoms)
-    return 0
+    # Only exterior rings are counted; holes do not add to the total.
+    exteriors = shapely.get_exterior_ring(shapely.get_parts(geometry))
+    return int(shapely.get_num_coordinates(exteriors).sum())
 
 
 def sanitize_name(value: str) -> str:
@@ -271,21 +460,87 @@ def build_gpkg_display_name(filename: str, layer_name: str) -> str:
     return f"{filename}:{layer_name}"
 
 
+def process_vector_info(
+    filepath: str,
+    source_name: str,
+    file_format: str,
+    folder_name: str,
+    folder_size: float,
+    decimal_places: int,
+    layer_name: str | None = None,
+) -> dict:
+    """
+    Build a metadata row from the layer header without decoding any features.
+    """
+    info = pyogrio.read_info(filepath, layer=layer_name, force_total_bounds=True)
+
+    if info["crs"] is None:
+        logging.warning(
+            "Dataset %s has no CRS. Spatial calculations may be inaccurate.",
+            source_name,
+        )
+        crs = CRS.from_user_input("EPSG:26916")
+        logging.info("Assigned CRS %s to dataset %s", crs, source_name)
+    else:
+        crs = CRS.from_user_input(info["crs"])
+    crs_uri = format_crs_uri(crs.to_string())
+
+    # The bounding box is reprojected in bulk by reproject_bounding_boxes.
+    source_extent = None
+    if info["features"] and info["total_bounds"] is not None:
+        source_extent = (crs.to_wkt(), tuple(info["total_bounds"]))
+
+    geometry_type = "Unknown"
+    declared_type = (info["geometry_type"] or "").split(" ")[0]
+    if info["features"] and declared_type and declared_type != "Unknown":
+        geometry_type = (
+            declared_type.replace("LineString", "Line").replace(
+                "MultiPolygon", "Polygon"
+            )
+            + " data"
+        )
+
+    return {
+        "filename": source_name,
+        "folder_name": folder_name,
+        "crs": crs_uri,
+        "file_format": file_format,
+        "geometry_type": geometry_type,
+        "bounding_box": "Unknown",
+        "spatial_resolution": "",
+        "folder_size": f"{folder_size} MB",
+        "wkt_outline": "",
+        "source_extent": source_extent,
+    }
+
+
 def process_vector(
     filepath: str,
     filename: str,
     file_format: str,
     folder_name: str,
     folder_size: float,
-    metadata: dict,
     decimal_places: int,
+    simplify_tolerance: float | None,
+    include_wkt: bool,
     layer_name: str | None = None,
     display_name: str | None = None,
-) -> None:
-    global include_wkt
+) -> dict:
     try:
         source_name = display_name or filename
         logging.info("Processing vector file %s", source_name)
+        if not include_wkt:
+            # Without an outline only header information is needed.
+            return process_vector_info(
+                filepath,
+                source_name,
+                file_format,
+                folder_name,
+                folder_size,
+                decimal_places,
+                layer_name=layer_name,
+            )
+
         read_kwargs = {"layer": layer_name} if layer_name is not None else {}
         gdf = gpd.read_file(filepath, **read_kwargs)
 
@@ -301,26 +556,36 @@ def process_vector(
             original_crs = gdf.crs.to_string()
             crs_uri = format_crs_uri(original_crs)
 
-        bbox = calculate_bounding_box(gdf, decimal_places)
-        if include_wkt:
-            wkt_outline = generate_wkt_outline(gdf, decimal_places)
-        else:
+        source_extent = None
+        if not gdf.empty:
+            source_extent = (gdf.crs.to_wkt(), tuple(gdf.total_bounds))
+        try:
+            gdf_4326 = to_wgs84(gdf)
+            logging.info("Converted GeoDataFrame to EPSG:4326.")
+            wkt_outline = generate_wkt_outline(
+                gdf_4326, decimal_places, simplify_tolerance
+            )
+        except Exception as exc:
+            logging.error("Could not reproject %s to EPSG:4326: %s", source_name, exc)
             wkt_outline = ""
         geometry_type = process_geometry_type(gdf)
 
-        metadata["filename"].append(source_name)
-        metadata["folder_name"].append(folder_name)
-        metadata["crs"].append(crs_uri)
-        metadata["file_format"].append(file_format)
-        metadata["geometry_type"].append(geometry_type)
-        metadata["bounding_box"].append(bbox)
-        metadata["spatial_resolution"].append("")
-        metadata["folder_size"].append(f"{folder_size} MB")
-        metadata["wkt_outline"].append(wkt_outline)
+        return {
+            "filename": source_name,
+            "folder_name": folder_name,
+            "crs": crs_uri,
+            "file_format": file_format,
+            "geometry_type": geometry_type,
+            "bounding_box": "Unknown",
+            "spatial_resolution": "",
+            "folder_size": f"{folder_size} MB",
+            "wkt_outline": wkt_outline,
+            "source_extent": source_extent,
+        }
     except Exception as exc:
         source_name = display_name or filename
         logging.error("Could not process vector file %s: %s", source_name, exc)
-        append_empty_metadata(metadata, source_name, folder_name, file_format, folder_size)
+        return empty_metadata(source_name, folder_name, file_format, folder_size)
 
 
 def process_raster(
@@ -328,12 +593,11 @@ def process_raster(
     filename: str,
     folder_name: str,
     folder_size: float,
-    metadata: dict,
     decimal_places: int,
-) -> None:
-    global include_wkt
+    include_wkt: bool,
+) -> dict | None:
     try:
-        with rasterio.open(filepath) as src:
+        with rasterio.Env(**RASTER_OPEN_OPTIONS), rasterio.open(filepath) as src:
             if src.crs is None:
                 logging.warning(
                     "Raster dataset %s has no CRS. Spatial calculations may be inaccurate.",
@@ -348,139 +612,214 @@ def process_raster(
             spatial_resolution = round((abs(pixel_size_x) + abs(pixel_size_y)) / 2, 2)
             bbox, wkt_outline = calculate_bounding_box_raster(src, decimal_places)
 
-            metadata["filename"].append(filename)
-            metadata["folder_name"].append(folder_name)
-            metadata["crs"].append(crs_uri)
-            metadata["file_format"].append("GeoTIFF")
-            metadata["geometry_type"].append("Raster data")
-            metadata["bounding_box"].append(bbox)
-            metadata["spatial_resolution"].append(spatial_resolution)
-            metadata["folder_size"].append(f"{folder_size} MB")
-            metadata["wkt_outline"].append(wkt_outline if include_wkt else None)
+            return {
+                "filename": filename,
+                "folder_name": folder_name,
+                "crs": crs_uri,
+                "file_format": "GeoTIFF",
+                "geometry_type": "Raster data",
+                "bounding_box": bbox,
+                "spatial_resolution": spatial_resolution,
+                "folder_size": f"{folder_size} MB",
+                "wkt_outline": wkt_outline if include_wkt else None,
+            }
 
     except Exception as exc:
         logging.error("Could not read raster file %s: %s", filename, exc)
+        return None
 
 
-def process_geodatabase(
-    root: str, folder_name: str, folder_size: float, metadata: dict
-) -> None:
+def process_geodatabase(root: str, folder_name: str, folder_size: float) -> dict:
     """
     Process a geodatabase to extract metadata.
     """
     geodatabase_name = os.path.basename(root)
+    return empty_metadata(geodatabase_name, folder_name, "Geodatabase", folder_size)
 
-    metadata["filename"].append(geodatabase_name)
-    metadata["folder_name"].append(folder_name)
-    metadata["file_format"].append("Geodatabase")
-    metadata["folder_size"].append(f"{folder_size} MB")
 
-    metadata["crs"].append("")
-    metadata["geometry_type"].append("")
-    metadata["bounding_box"].append("")
-    metadata["spatial_resolution"].append("")
-    metadata["wkt_outline"].append("")
+def empty_metadata(
+    filename: str, folder_name: str, file_format: str, folder_size: float
+) -> dict:
+    return {
+        "filename": filename,
+        "folder_name": folder_name,
+        "crs": "",
+        "file_format": file_format,
+        "geometry_type": "",
+        "bounding_box": "",
+        "spatial_resolution": "",
+        "folder_size": f"{folder_size} MB",
+        "wkt_outline": "",
+    }
 
 
-def append_empty_metadata(
-    metadata: dict, filename: str, folder_name: str, file_format: str, folder_size: float
-) -> None:
-    metadata["filename"].append(filename)
-    metadata["folder_name"].append(folder_name)
-    metadata["crs"].append("")
-    metadata["file_format"].append(file_format)
-    metadata["geometry_type"].append("")
-    metadata["bounding_box"].append("")
-    metadata["spatial_resolution"].append("")
-    metadata["folder_size"].append(f"{folder_size} MB")
-    metadata["wkt_outline"].append("")
+def _metadata_rows(
+    task: tuple[str, str, str, float],
+    decimal_places: int,
+    simplify_tolerance: float | None,
+    include_wkt: bool,
+) -> list[dict]:
+    """
+    Build the metadata rows for one worklist entry.
+    """
+    filepath, kind, folder_name, folder_size = task
+    filename = os.path.basename(filepath)
 
+    if kind == "gdb":
+        return [process_geodatabase(filepath, folder_name, folder_size)]
 
-def extract_metadata() -> None:
+    if kind == "raster":
+        row = process_raster(
+            filepath, filename, folder_name, folder_size, decimal_places, include_wkt
+        )
+        return [row] if row is not None else []
+
+    if kind == "gpkg":
+        layers = get_gpkg_layers(filepath)
+        if not layers:
+            return [empty_metadata(filename, folder_name, "GeoPackage", folder_size)]
+
+        return [
+            process_vector(
+                filepath,
+                filename,
+                "GeoPackage",
+                folder_name,
+                folder_size,
+                decimal_places,
+                simplify_tolerance,
+                include_wkt,
+                layer_name=layer_name,
+                display_name=build_gpkg_display_name(filename, layer_name),
+            )
+            for layer_name in layers
+        ]
+
+    file_format = VECTOR_FORMATS[os.path.splitext(filename)[1].lower()]
+    return [
+        process_vector(
+            filepath,
+            filename,
+            file_format,
+            folder_name,
+            folder_size,
+            decimal_places,
+            simplify_tolerance,
+            include_wkt,
+        )
+    ]
+
+
+def _process_one(
+    task: tuple[str, str, str, float],
+    decimal_places: int,
+    simplify_tolerance: float | None,
+    include_wkt: bool,
+) -> list[dict]:
+    """
+    Extract the metadata rows for one worklist entry; runs in a worker thread.
+
+    Rows are keyed by the final CSV headers so the parent can build the
+    DataFrame without renaming columns. Vector rows also carry their native
+    "source_extent" for reproject_bounding_boxes.
+    """
+    records = []
+    for row in _metadata_rows(task, decimal_places, simplify_tolerance, include_wkt):
+        record = {column_mapping[field]: row[field] for field in METADATA_FIELDS}
+        if row.get("source_extent") is not None:
+            record["source_extent"] = row["source_extent"]
+        records.append(record)
+    return records
+
+
+def extract_metadata(
+    root_directory: str,
+    output_csv: str,
+    decimal_places: int = 3,
+    simplify_tolerance: float | None = None,
+    include_wkt: bool = True,
+    max_workers: int | None = None,
+) -> None:
     """
     Extract metadata from geospatial datasets in a directory.
     """
-    metadata = {
-        "filename": [],
-        "folder_name": [],
-        "crs": [],
-        "file_format": [],
-        "geometry_type": [],
-        "bounding_box": [],
-        "spatial_resolution": [],
-        "folder_size": [],
-        "wkt_outline": [],
-    }
-
-    vector_formats = {
-        ".shp": "Shapefile",
-        ".geojson": "GeoJSON",
-    }
-
+    worklist = []
+    # Folder sizes are recursive, so compute each one once rather than per file.
+    dir_size_cache: dict[str, float] = {}
     for root, dirs, files in os.walk(root_directory):
         gdb_dirs = [dir_name for dir_name in dirs if dir_name.endswith(".gdb")]
         for dir_name in gdb_dirs:
             gdb_path = os.path.join(root, dir_name)
             folder_name = os.path.basename(os.path.dirname(gdb_path))
             folder_size = get_folder_size(gdb_path, unit="MB")
-            process_geodatabase(gdb_path, folder_name, folder_size, metadata)
+            worklist.append((gdb_path, "gdb", folder_name, folder_size))
         # Prevent walking into geodatabases so we only record top-level metadata.
         dirs[:] = [dir_name for dir_name in dirs if not dir_name.endswith(".gdb")]
         for filename in files:
             file_ext = os.path.splitext(filename)[1].lower()
-            filepath = os.path.join(root, filename)
-            folder_name = os.path.basename(os.path.dirname(filepath))
-            folder_size = get_folder_size(os.path.dirname(filepath), unit="MB")
-
-            if file_ext in vector_formats:
-                process_vector(
-                    filepath,
-                    filename,
-                    vector_formats[file_ext],
-                    folder_name,
-                    folder_size,
-                    metadata,
-                    decimal_places,
-                )
+            if file_ext in VECTOR_FORMATS:
+                kind = "vector"
             elif file_ext == ".tif":
-                process_raster(
-                    filepath, filename, folder_name, folder_size, metadata, decimal_places
-                )
+                kind = "raster"
             elif file_ext == ".gpkg":
-                layers = get_gpkg_layers(filepath)
-                if not layers:
-                    append_empty_metadata(
-                        metadata, filename, folder_name, "GeoPackage", folder_size
-                    )
-                    continue
-
-                for layer_name in layers:
-                    process_vector(
-                        filepath,
-                        filename,
-                        "GeoPackage",
-                        folder_name,
-                        folder_size,
-                        metadata,
-                        decimal_places,
-                        layer_name=layer_name,
-                        display_name=build_gpkg_display_name(filename, layer_name),
-                    )
-
-    df = pd.DataFrame(metadata)
-    df.rename(columns=column_mapping, inplace=True)
+                kind = "gpkg"
+            else:
+                continue
 
+            filepath = os.path.join(root, filename)
+            folder_name = os.path.basename(root)
+            if root not in dir_size_cache:
+                dir_size_cache[root] = get_folder_size(root, unit="MB")
+            folder_size = dir_size_cache[root]
+            worklist.append((filepath, kind, folder_name, folder_size))
+
+    process_one = partial(
+        _process_one,
+        decimal_places=decimal_places,
+        simplify_tolerance=simplify_tolerance,
+        include_wkt=include_wkt,
+    )
     output_csv_path = os.path.join(root_directory, output_csv)
-    df.to_csv(output_csv_path, index=False)
+    with open(output_csv_path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(
+            csv_file, fieldnames=OUTPUT_COLUMNS, lineterminator="\n"
+        )
+        writer.writeheader()
+
+        # Rows are written as results arrive so memory stays flat and an
+        # interrupted run keeps what it has finished. They are buffered just
+        # long enough to reproject their bounding boxes in batches.
+        pending: list[dict] = []
+        # GDAL, GEOS and PROJ release the GIL, so threads scale without the
+        # pickling overhead of processes and share the Transformer cache.
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            for file_rows in executor.map(process_one, worklist):
+                pending.extend(file_rows)
+                if len(pending) >= WRITE_BATCH_SIZE:
+                    reproject_bounding_boxes(pending, decimal_places)
+                    writer.writerows(pending)
+                    pending.clear()
+        reproject_bounding_boxes(pending, decimal_places)
+        writer.writerows(pending)
+
     print(f"Metadata extraction complete. CSV saved to {output_csv_path}")
 
 
-def extract_attribute_table_info(root_directory: str, output_dir: str) -> None:
-    vector_formats = {
-        ".shp": "Shapefile",
-        ".geojson": "GeoJSON",
-    }
+def read_field_types(filepath: str, layer: str | None = None) -> list[tuple[str, str]]:
+    """
+    List the (column, dtype) pairs a layer would load with, without reading features.
+    """
+    info = pyogrio.read_info(filepath, layer=layer)
+    field_types = [
+        (str(name), STRING_DTYPE if dtype == "object" else str(dtype))
+        for name, dtype in zip(info["fields"], info["dtypes"])
+    ]
+    if info["geometry_type"] is not None:
+        field_types.append(("geometry", "geometry"))
+    return field_types
+
 
+def extract_attribute_table_info(root_directory: str, output_dir: str) -> None:
     os.makedirs(output_dir, exist_ok=True)
 
     for root, _, files in os.walk(root_directory):
@@ -488,16 +827,15 @@ def extract_attribute_table_info(root_directory: str, output_dir: str) -> None:
             file_ext = os.path.splitext(filename)[1].lower()
             filepath = os.path.join(root, filename)
 
-            if file_ext in vector_formats:
+            if file_ext in VECTOR_FORMATS:
                 try:
-                    gdf = gpd.read_file(filepath)
                     field_info = []
-                    for column in gdf.columns:
+                    for column, dtype in read_field_types(filepath):
                         field_info.append(
                             {
                                 "friendlier_id": filename,
                                 "field_name": column,
-                                "field_type": str(gdf[column].dtype),
+                                "field_type": dtype,
                                 "values": "",
                                 "definition": "",
                                 "definition_source": "",
@@ -519,17 +857,16 @@ def extract_attribute_table_info(root_directory: str, output_dir: str) -> None:
 
                 for layer_name in layers:
                     try:
-                        gdf = gpd.read_file(filepath, layer=layer_name)
                         friendlier_id = layer_identifiers.get(
                             layer_name, build_gpkg_display_name(filename, layer_name)
                         )
                         field_info = []
-                        for column in gdf.columns:
+                        for column, dtype in read_field_types(filepath, layer_name):
                             field_info.append(
                                 {
                                     "friendlier_id": friendlier_id,
                                     "field_name": column,
-                                    "field_type": str(gdf[column].dtype),
+                                    "field_type": dtype,
                                     "values": "",
                                     "definition": "",
                                     "definition_source": "",
@@ -551,7 +888,13 @@ def extract_attribute_table_info(root_directory: str, output_dir: str) -> None:
 
 
 def main() -> None:
-    extract_metadata()
+    extract_metadata(
+        root_directory,
+        output_csv,
+        decimal_places=decimal_places,
+        simplify_tolerance=simplify_tolerance,
+        include_wkt=include_wkt,
+    )
     extract_attribute_table_info(root_directory, output_directory)
 
 
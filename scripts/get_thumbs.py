@@ -2,15 +2,105 @@
 
 from __future__ import annotations
 
+import math
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 import geopandas as gpd
-import matplotlib.pyplot as plt
 import rasterio
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from rasterio.enums import ColorInterp, Resampling
 from rasterio.plot import show
+from rasterio.transform import Affine
 from tqdm import tqdm
 
 
+_thread_figures = threading.local()
+
+
+def _thumbnail_axes(width: int, height: int, dpi: int):
+    """
+    Return a Figure and Axes reused for every thumbnail of a given size.
+
+    Building a Figure is far more expensive than drawing a small thumbnail, so
+    each thread creates one per size and clears it between files. Figures are
+    made without pyplot, whose global state is not thread-safe.
+    """
+    figures = getattr(_thread_figures, "figures", None)
+    if figures is None:
+        figures = _thread_figures.figures = {}
+    key = (width, height, dpi)
+    if key not in figures:
+        fig = Figure(figsize=(width, height), dpi=dpi)
+        FigureCanvasAgg(fig)
+        figures[key] = (fig, fig.add_subplot())
+    return figures[key]
+
+
+def decimate_for_thumbnail(gdf, width: int, height: int, dpi: int):
+    """
+    Simplify geometries to roughly one thumbnail pixel before plotting.
+
+    Detail finer than a pixel is invisible at thumbnail size but still has to
+    be tessellated by matplotlib, so dense layers are generalized first and
+    features that collapse entirely are dropped.
+    """
+    if gdf.empty:
+        return gdf
+
+    minx, miny, maxx, maxy = gdf.total_bounds
+    tolerance = max(maxx - minx, maxy - miny) / (max(width, height) * dpi)
+    if not tolerance > 0:
+        return gdf
+
+    geometry = gdf.geometry.simplify(tolerance, preserve_topology=False)
+    keep = ~(geometry.is_empty | geometry.isna())
+    return gdf.set_geometry(geometry)[keep]
+
+
+def read_thumbnail_array(src, width: int, height: int, dpi: int):
+    """
+    Read a raster at roughly thumbnail resolution.
+
+    Returns the (masked) pixel array and the affine transform matching it.
+    Bands are chosen the same way ``rasterio.plot.show`` chooses them, but the
+    read is decimated so GDAL can serve it from overviews instead of loading
+    the full-resolution grid.
+    """
+    scale = max(1.0, max(src.width, src.height) / (max(width, height) * dpi))
+    out_width = max(1, math.ceil(src.width / scale))
+    out_height = max(1, math.ceil(src.height / scale))
+
+    if src.count <= 2:
+        indexes = 1
+        out_shape = (out_height, out_width)
+    else:
+        band_for = dict(zip(src.colorinterp, src.indexes))
+        rgb = (ColorInterp.red, ColorInterp.green, ColorInterp.blue)
+        if all(ci in band_for for ci in rgb):
+            indexes = [band_for[ci] for ci in rgb]
+        else:
+            indexes = [1, 2, 3]
+        out_shape = (len(indexes), out_height, out_width)
+
+    data = src.read(
+        indexes, out_shape=out_shape, masked=True, resampling=Resampling.average
+    )
+    transform = src.transform * Affine.scale(
+        src.width / out_width, src.height / out_height
+    )
+    return data, transform
+
+
+def _save_thumbnail(fig, ax, thumbnail_path: str) -> None:
+    """Hide the axes and write the current figure to ``thumbnail_path``."""
+    ax.axis("off")
+    fig.savefig(thumbnail_path, bbox_inches="tight", pad_inches=0)
+
+
 def create_vector_thumbnail(
     vector_path: str,
     thumbnail_path: str,
@@ -20,12 +110,11 @@ def create_vector_thumbnail(
 ) -> None:
     """Create a thumbnail for a vector dataset and save it as an image."""
     try:
-        gdf = gpd.read_file(vector_path)
-        fig, ax = plt.subplots(figsize=(width, height), dpi=dpi)
+        gdf = decimate_for_thumbnail(gpd.read_file(vector_path), width, height, dpi)
+        fig, ax = _thumbnail_axes(width, height, dpi)
+        ax.clear()
         gdf.plot(ax=ax)
-        ax.axis("off")
-        plt.savefig(thumbnail_path, bbox_inches="tight", pad_inches=0)
-        plt.close(fig)
+        _save_thumbnail(fig, ax, thumbnail_path)
         print(f"Vector thumbnail saved at {thumbnail_path}")
     except Exception as exc:
         print(f"Error processing {vector_path}: {exc}")
@@ -41,22 +130,34 @@ def create_raster_thumbnail(
     """Create a thumbnail for a raster file and save it as an image."""
     try:
         with rasterio.open(raster_path) as src:
-            fig, ax = plt.subplots(figsize=(width, height), dpi=dpi)
-            show(src, ax=ax)
-            ax.axis("off")
-            plt.savefig(thumbnail_path, bbox_inches="tight", pad_inches=0)
-            plt.close(fig)
+            fig, ax = _thumbnail_axes(width, height, dpi)
+            data, transform = read_thumbnail_array(src, width, height, dpi)
+            ax.clear()
+            show(data, transform=transform, ax=ax)
+            _save_thumbnail(fig, ax, thumbnail_path)
             print(f"Raster thumbnail saved at {thumbnail_path}")
     except Exception as exc:
         print(f"Error processing {raster_path}: {exc}")
 
 
+def _create_thumbnail(
+    job: tuple[str, str], width: int, height: int, dpi: int
+) -> None:
+    """Create the thumbnail for one ``(file, thumbnail)`` pair in a worker thread."""
+    file_path, thumbnail_path = job
+    if file_path.endswith(".shp") or file_path.endswith(".gpkg"):
+        create_vector_thumbnail(file_path, thumbnail_path, width, height, dpi)
+    elif file_path.endswith(".tif"):
+        create_raster_thumbnail(file_path, thumbnail_path, width, height, dpi)
+
+
 def create_thumbnails_for_directory(
     data_dir: str,
     thumbnail_dir: str,
     width: int = 2,
     height: int = 2,
     dpi: int = 100,
+    max_workers: int | None = None,
 ) -> None:
     """
     Scan a directory for shapefiles, geopackages, and rasters, generating thumbnails for each.
@@ -71,14 +172,31 @@ def create_thumbnails_for_directory(
 
     print(f"Found {len(files_to_process)} files to process.")
 
-    for file_path in tqdm(files_to_process, desc="Generating Thumbnails"):
+    # Thumbnails are named by stem, so roads.shp and roads.gpkg, or the same
+    # name in two subdirectories, would render into one PNG at the same time.
+    # Only the first file claiming a thumbnail path is rendered.
+    jobs = []
+    claimed_thumbnails = set()
+    for file_path in files_to_process:
         thumbnail_name = f"{os.path.splitext(os.path.basename(file_path))[0]}.png"
         thumbnail_path = os.path.join(thumbnail_dir, thumbnail_name)
-
-        if file_path.endswith(".shp") or file_path.endswith(".gpkg"):
-            create_vector_thumbnail(file_path, thumbnail_path, width, height, dpi)
-        elif file_path.endswith(".tif"):
-            create_raster_thumbnail(file_path, thumbnail_path, width, height, dpi)
+        if thumbnail_path in claimed_thumbnails:
+            print(f"Skipping {file_path}: {thumbnail_path} is already claimed")
+            continue
+        claimed_thumbnails.add(thumbnail_path)
+        jobs.append((file_path, thumbnail_path))
+
+    create_thumbnail = partial(
+        _create_thumbnail,
+        width=width,
+        height=height,
+        dpi=dpi,
+    )
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        results = executor.map(create_thumbnail, jobs)
+        progress = tqdm(results, total=len(jobs), desc="Generating Thumbnails")
+        for _ in progress:
+            pass
 
 
 def main() -> None:
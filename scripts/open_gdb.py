@@ -8,12 +8,33 @@ Example:
 from __future__ import annotations
 
 import argparse
+import contextlib
 import csv
+import io
 import json
+import math
+import mmap
 import os
 import re
+import secrets
 import sys
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lxml import etree
+
+try:
+    from osgeo import gdal, ogr, osr  # type: ignore
+except Exception:
+    # Reported by _open_gdb; the helpers fall back where they can.
+    gdal = ogr = osr = None
+
+try:
+    from nanoid import generate as _nanoid_generate  # type: ignore
+except Exception:
+    _nanoid_generate = None
 
 # ---- User config (optional) ----
 # If you leave CLI args blank, these defaults are used.
@@ -24,8 +45,124 @@ DEFAULT_RUN_FIELDS_CSV = True
 DEFAULT_ID_PREFIX = "b1g_"
 # --------------------------------
 
+# The opening tag must end the element name, so tags such as <metadataFoo>
+# in binary noise do not start a match.
+_METADATA_RE = re.compile(rb"<metadata\b[^>]*>.*?</metadata\s*>", re.DOTALL)
+
+# Used by _strip_html on every XML text node.
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+
+# Smallest .gdbtable that could hold a "<metadata></metadata>" block.
+_MIN_METADATA_BYTES = len(b"<metadata></metadata>")
+
+# _xml_layer_metadata streams each block and only looks at these elements,
+# clearing each one once it has been read.
+_XML_STREAM_TAGS = ("attr", "detailed", "dataIdInfo", "idinfo")
+
+# Compiled XPath queries for _xml_layer_metadata.
+_ENTTYPL_XP = etree.XPath("./enttyp/enttypl")
+_ATTR_FIELD_XPS = {
+    "name": etree.XPath("./attrlabl"),
+    "description": etree.XPath("./attrdef"),
+    "definition_source": etree.XPath("./attrdefs"),
+    "alias": etree.XPath("./attalias"),
+    "domain_description": etree.XPath("./attrdomv/udom"),
+}
+# Layer-level values, relative to <dataIdInfo> (ISO) or <idinfo> (FGDC).
+# The first matching element in the block supplies each value.
+_ISO_XPS = {
+    "iso_title": etree.XPath("./idCitation/resTitle"),
+    "iso_abstract": etree.XPath("./idAbs"),
+    "iso_use_limitation": etree.XPath("./resConst/Consts/useLimitation"),
+    "iso_other_constraints": etree.XPath("./resConst/Consts/otherConstraints"),
+    "iso_access_constraints": etree.XPath("./resConst/Consts/accessConstraints"),
+    "iso_use_constraints": etree.XPath("./resConst/Consts/useConstraints"),
+}
+_FGDC_XPS = {
+    "fgdc_title": etree.XPath("./citation/citeinfo/title"),
+    "fgdc_abstract": etree.XPath("./descript/abstract"),
+    "fgdc_purpose": etree.XPath("./descript/purpose"),
+    "fgdc_accconst": etree.XPath("./accconst"),
+    "fgdc_useconst": etree.XPath("./useconst"),
+    "fgdc_secclass": etree.XPath("./secinfo/secclass"),
+}
+_TOPIC_CATEGORY_XP = etree.XPath("./tpCat")
+_THEME_KEY_XP = etree.XPath("./keywords/theme/themekey")
+
+_LAYER_TITLE_KEYS = ("iso_title", "fgdc_title")
+_DESCRIPTION_KEYS = ("iso_abstract", "fgdc_abstract", "fgdc_purpose")
+_RIGHTS_KEYS = (
+    # FGDC-style
+    "fgdc_accconst",
+    "fgdc_useconst",
+    "fgdc_secclass",
+    # ISO-style
+    "iso_use_limitation",
+    "iso_other_constraints",
+    "iso_access_constraints",
+    "iso_use_constraints",
+)
+
+_ISO_TOPIC_CATEGORIES = frozenset(
+    {
+        "farming",
+        "biota",
+        "boundaries",
+        "climatology/meteorology/atmosphere",
+        "economy",
+        "elevation",
+        "environment",
+        "geoscientificinformation",
+        "health",
+        "imagerybasemapsearthcover",
+        "intelligencemilitary",
+        "inlandwaters",
+        "location",
+        "oceans",
+        "planningcadastre",
+        "society",
+        "structure",
+        "transportation",
+        "utilitiescommunication",
+    }
+)
+
+# Output files are written through 1 MiB buffers rather than the 8 KiB
+# default, which cuts write() calls when hundreds of field CSVs are produced.
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Points sampled along each bbox edge before reprojecting it to WGS84.
+_BBOX_EDGE_POINTS = 64
+
+# Below this many .gdbtable files the tables are scanned without a pool.
+_MIN_PARALLEL_TABLES = 4
+
+# Below this many layers, feature scans run on the main dataset.
+_MIN_PARALLEL_LAYERS = 4
+
+# Worker threads each open their own dataset; GDAL datasets and coordinate
+# transformations must not be used from two threads at once.
+_thread_datasets = threading.local()
+_TRANSFORM_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _field_def_capabilities(field_def_type: type) -> Tuple[bool, bool, bool, bool]:
+    # Probe the optional FieldDefn getters once per class; hasattr on SWIG
+    # proxies is slow enough to matter when repeated for every field.
+    return (
+        hasattr(field_def_type, "GetComment"),
+        hasattr(field_def_type, "GetDescription"),
+        hasattr(field_def_type, "GetDomainName"),
+        hasattr(field_def_type, "GetAlternativeName"),
+    )
+
 
 def _field_def_to_dict(field_def) -> Dict[str, Any]:
+    has_comment, has_description, has_domain, has_alias = _field_def_capabilities(
+        type(field_def)
+    )
     field_info = {
         "name": field_def.GetName(),
         "type": field_def.GetTypeName(),
@@ -36,12 +173,12 @@ def _field_def_to_dict(field_def) -> Dict[str, Any]:
     }
 
     description = None
-    if hasattr(field_def, "GetComment"):
+    if has_comment:
         try:
             description = field_def.GetComment()
         except Exception:
             description = None
-    if not description and hasattr(field_def, "GetDescription"):
+    if not description and has_description:
         try:
             description = field_def.GetDescription()
         except Exception:
@@ -49,7 +186,7 @@ def _field_def_to_dict(field_def) -> Dict[str, Any]:
     if description:
         field_info["description"] = description
 
-    if hasattr(field_def, "GetDomainName"):
+    if has_domain:
         try:
             domain_name = field_def.GetDomainName()
         except Exception:
@@ -57,7 +194,7 @@ def _field_def_to_dict(field_def) -> Dict[str, Any]:
         if domain_name:
             field_info["domain"] = domain_name
 
-    if hasattr(field_def, "GetAlternativeName"):
+    if has_alias:
         try:
             alt_name = field_def.GetAlternativeName()
         except Exception:
@@ -68,6 +205,26 @@ def _field_def_to_dict(field_def) -> Dict[str, Any]:
     return field_info
 
 
+def _scan_one_gdbtable(path: str) -> List[str]:
+    try:
+        if os.path.getsize(path) < _MIN_METADATA_BYTES:
+            return []
+        # Map the table instead of reading it so only the pages the regex
+        # touches are loaded, and decode just the matched XML. Most tables
+        # hold no metadata at all, so a plain substring search rules them out
+        # before any regex work.
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = data.find(b"<metadata")
+            if start == -1:
+                return []
+            return [
+                data[match.start():match.end()].decode("utf-8", errors="ignore")
+                for match in _METADATA_RE.finditer(data, start)
+            ]
+    except Exception:
+        return []
+
+
 def _extract_metadata_xml_from_gdb(gdb_path: str) -> List[str]:
     xml_chunks: List[str] = []
     try:
@@ -79,21 +236,17 @@ def _extract_metadata_xml_from_gdb(gdb_path: str) -> List[str]:
     except Exception:
         return xml_chunks
 
-    pattern = re.compile(r"<metadata.*?</metadata>", re.DOTALL)
-
-    for path in files:
-        try:
-            with open(path, "rb") as f:
-                data = f.read()
-        except Exception:
-            continue
-
-        try:
-            text = data.decode("utf-8", errors="ignore")
-        except Exception:
-            continue
+    # Tables are scanned independently, so spread them over processes unless
+    # there are too few to be worth starting a pool.
+    if len(files) < _MIN_PARALLEL_TABLES:
+        for path in files:
+            xml_chunks.extend(_scan_one_gdbtable(path))
+        return xml_chunks
 
-        xml_chunks.extend(pattern.findall(text))
+    max_workers = min(os.cpu_count() or 1, len(files))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for chunks in executor.map(_scan_one_gdbtable, files, chunksize=4):
+            xml_chunks.extend(chunks)
 
     return xml_chunks
 
@@ -108,212 +261,197 @@ def _first_text(element) -> Optional[str]:
 def _strip_html(text: str) -> str:
     if not text:
         return text
-    text = re.sub(r"<[^>]+>", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
-
-
-def _xml_attribute_map(xml_texts: Iterable[str]) -> Dict[str, Dict[str, Dict[str, str]]]:
-    from xml.etree import ElementTree as ET
-
-    layer_map: Dict[str, Dict[str, Dict[str, str]]] = {}
-
-    for xml_text in xml_texts:
-        try:
-            root = ET.fromstring(xml_text)
-        except ET.ParseError:
-            continue
-
-        for detailed in root.findall(".//detailed"):
-            layer_name = detailed.get("Name") or _first_text(detailed.find("./enttyp/enttypl"))
-            if not layer_name:
-                continue
-
-            layer_entry = layer_map.setdefault(layer_name, {})
-            for attr in detailed.findall(".//attr"):
-                field_name = _first_text(attr.find("./attrlabl"))
-                if not field_name:
-                    continue
-
-                meta: Dict[str, str] = {}
-                description = _first_text(attr.find("./attrdef"))
-                definition_source = _first_text(attr.find("./attrdefs"))
-                alias = _first_text(attr.find("./attalias"))
-                domain = _first_text(attr.find("./attrdomv/udom"))
-
-                if description:
-                    meta["description"] = description
-                if definition_source:
-                    meta["definition_source"] = definition_source
-                if alias:
-                    meta["alias"] = alias
-                if domain:
-                    meta["domain_description"] = domain
-
-                if meta:
-                    existing = layer_entry.setdefault(field_name, {})
-                    for key, value in meta.items():
-                        if key not in existing:
-                            existing[key] = value
-
-    return layer_map
-
-
-def _xml_layer_descriptions(xml_texts: Iterable[str]) -> Dict[str, str]:
-    from xml.etree import ElementTree as ET
-
-    layer_descriptions: Dict[str, str] = {}
-
-    for xml_text in xml_texts:
-        try:
-            root = ET.fromstring(xml_text)
-        except ET.ParseError:
-            continue
-
-        layer_name = None
-        detailed = root.find(".//detailed")
-        if detailed is not None:
-            layer_name = detailed.get("Name") or _first_text(detailed.find("./enttyp/enttypl"))
-
-        if not layer_name:
-            layer_name = _first_text(root.find(".//dataIdInfo/idCitation/resTitle"))
-        if not layer_name:
-            layer_name = _first_text(root.find(".//idinfo/citation/citeinfo/title"))
-
-        if not layer_name:
+    return _WS_RE.sub(" ", _TAG_RE.sub("", text)).strip()
+
+
+def _first_match_text(xpath, element) -> Optional[str]:
+    matches = xpath(element)
+    return _first_text(matches[0]) if matches else None
+
+
+def _iter_xml_elements(data: bytes, recover: bool = False) -> Iterator[Any]:
+    # Hand each element of interest to the caller, then clear it. Finished
+    # containers are also detached from their parent so the tree built so
+    # far stays small. Attributes are only cleared: the <enttyp> sibling
+    # before them still names their layer. Comments and processing
+    # instructions are dropped as ElementTree did, so they cannot split an
+    # element's .text.
+    context = etree.iterparse(
+        io.BytesIO(data),
+        events=("end",),
+        tag=_XML_STREAM_TAGS,
+        huge_tree=True,
+        recover=recover,
+        remove_comments=True,
+        remove_pis=True,
+    )
+    for _, element in context:
+        yield element
+        if element.tag == "attr":
+            element.clear(keep_tail=True)
             continue
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def _add_xml_attribute(attr, layers: Dict[str, Dict[str, Any]]) -> None:
+    detailed = next(attr.iterancestors("detailed"), None)
+    if detailed is None:
+        return
+
+    layer_name = detailed.get("Name") or _first_match_text(_ENTTYPL_XP, detailed)
+    field_name = _first_match_text(_ATTR_FIELD_XPS["name"], attr)
+    if not (layer_name and field_name):
+        return
+
+    meta: Dict[str, str] = {}
+    for key in ("description", "definition_source", "alias", "domain_description"):
+        value = _first_match_text(_ATTR_FIELD_XPS[key], attr)
+        if value:
+            meta[key] = value
+
+    layer_attrs = layers.setdefault(layer_name, {}).setdefault("attrs", {})
+    if meta:
+        existing = layer_attrs.setdefault(field_name, {})
+        for key, value in meta.items():
+            if key not in existing:
+                existing[key] = value
+
+
+def _merge_xml_attributes(
+    layers: Dict[str, Dict[str, Any]], block_layers: Dict[str, Dict[str, Any]]
+) -> None:
+    for layer_name, entry in block_layers.items():
+        layer_attrs = layers.setdefault(layer_name, {}).setdefault("attrs", {})
+        for field_name, meta in entry["attrs"].items():
+            existing = layer_attrs.setdefault(field_name, {})
+            for key, value in meta.items():
+                if key not in existing:
+                    existing[key] = value
+
+
+def _scan_xml_block(
+    data: bytes,
+    block_layers: Dict[str, Dict[str, Any]],
+    recover: bool = False,
+) -> Tuple[Dict[str, Optional[str]], List[str], List[str]]:
+    # Field attributes go into block_layers; the layer-level values come
+    # back as (first values by key, ISO topic categories, FGDC theme keys).
+    first: Dict[str, Optional[str]] = {}
+    topics: List[str] = []
+    theme_keys: List[str] = []
+    for element in _iter_xml_elements(data, recover=recover):
+        tag = element.tag
+        if tag == "attr":
+            _add_xml_attribute(element, block_layers)
+        elif tag == "detailed":
+            # Record entities even when none of their attributes matched.
+            layer_name = element.get("Name") or _first_match_text(_ENTTYPL_XP, element)
+            if layer_name:
+                block_layers.setdefault(layer_name, {}).setdefault("attrs", {})
+            first.setdefault("detailed", layer_name)
+        else:
+            xpaths = _ISO_XPS if tag == "dataIdInfo" else _FGDC_XPS
+            for key, xpath in xpaths.items():
+                if key not in first:
+                    matches = xpath(element)
+                    if matches:
+                        first[key] = _first_text(matches[0])
+            if tag == "dataIdInfo":
+                topics.extend(_first_text(node) for node in _TOPIC_CATEGORY_XP(element))
+            else:
+                theme_keys.extend(_first_text(node) for node in _THEME_KEY_XP(element))
+    return first, topics, theme_keys
 
-        description = (
-            _first_text(root.find(".//dataIdInfo/idAbs"))
-            or _first_text(root.find(".//idinfo/descript/abstract"))
-            or _first_text(root.find(".//idinfo/descript/purpose"))
-        )
-
-        if description and layer_name not in layer_descriptions:
-            layer_descriptions[layer_name] = description
 
-    return layer_descriptions
+def _unique_joined(values: List[str]) -> str:
+    # dict.fromkeys drops repeats in one pass and keeps first-seen order.
+    return " | ".join(dict.fromkeys(values))
 
 
-def _xml_layer_rights(xml_texts: Iterable[str]) -> Dict[str, str]:
-    from xml.etree import ElementTree as ET
+def _xml_layer_metadata(xml_texts: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Collect per-layer XML metadata in one streaming pass over each block.
 
-    layer_rights: Dict[str, str] = {}
+    Returns ``{layer_name: {"attrs": ..., "description": ..., "rights": ...,
+    "theme": ...}}``; a key is present only when the XML supplied it.
+    """
+    layers: Dict[str, Dict[str, Any]] = {}
 
     for xml_text in xml_texts:
+        data = xml_text.encode("utf-8")
+        block_layers: Dict[str, Dict[str, Any]] = {}
         try:
-            root = ET.fromstring(xml_text)
-        except ET.ParseError:
+            first, topics, theme_keys = _scan_xml_block(data, block_layers)
+        except etree.XMLSyntaxError:
+            # The regex scan can return partial blocks. Their field
+            # attributes are still recovered, but the layer-level values
+            # are only taken from well-formed blocks.
+            block_layers = {}
+            try:
+                _scan_xml_block(data, block_layers, recover=True)
+            except etree.XMLSyntaxError:
+                pass
+            _merge_xml_attributes(layers, block_layers)
             continue
 
-        layer_name = None
-        detailed = root.find(".//detailed")
-        if detailed is not None:
-            layer_name = detailed.get("Name") or _first_text(detailed.find("./enttyp/enttypl"))
-
-        if not layer_name:
-            layer_name = _first_text(root.find(".//dataIdInfo/idCitation/resTitle"))
-        if not layer_name:
-            layer_name = _first_text(root.find(".//idinfo/citation/citeinfo/title"))
+        _merge_xml_attributes(layers, block_layers)
 
+        layer_name = first.get("detailed")
+        for key in _LAYER_TITLE_KEYS:
+            if layer_name:
+                break
+            layer_name = first.get(key)
         if not layer_name:
             continue
 
-        rights_values: List[str] = []
-
-        # FGDC-style
-        for path in [
-            ".//idinfo/accconst",
-            ".//idinfo/useconst",
-            ".//idinfo/secinfo/secclass",
-        ]:
-            value = _first_text(root.find(path))
-            if value:
-                rights_values.append(value)
-
-        # ISO-style
-        for path in [
-            ".//dataIdInfo/resConst/Consts/useLimitation",
-            ".//dataIdInfo/resConst/Consts/otherConstraints",
-            ".//dataIdInfo/resConst/Consts/accessConstraints",
-            ".//dataIdInfo/resConst/Consts/useConstraints",
-        ]:
-            value = _first_text(root.find(path))
-            if value:
-                rights_values.append(value)
+        description = next((first[key] for key in _DESCRIPTION_KEYS if first.get(key)), None)
+        if description:
+            layers.setdefault(layer_name, {}).setdefault("description", description)
 
+        rights_values = [first[key] for key in _RIGHTS_KEYS if first.get(key)]
         if rights_values:
-            uniq = []
-            for item in rights_values:
-                if item not in uniq:
-                    uniq.append(item)
-            layer_rights[layer_name] = " | ".join(uniq)
-
-    return layer_rights
+            layers.setdefault(layer_name, {})["rights"] = _unique_joined(rights_values)
 
+        topics = [value for value in topics if value]
+        topics.extend(
+            value for value in theme_keys if value and value.lower() in _ISO_TOPIC_CATEGORIES
+        )
+        if topics:
+            layers.setdefault(layer_name, {})["theme"] = _unique_joined(topics)
 
-def _xml_layer_themes(xml_texts: Iterable[str]) -> Dict[str, str]:
-    from xml.etree import ElementTree as ET
+    return layers
 
-    layer_themes: Dict[str, str] = {}
 
-    for xml_text in xml_texts:
-        try:
-            root = ET.fromstring(xml_text)
-        except ET.ParseError:
-            continue
+def _layer_lookup(mapping: Dict[str, Any]) -> Callable[[str], Any]:
+    # Names match exactly first. Otherwise a key matches when one name is a
+    # dot-qualified form of the other (db.owner.roads and roads), and the
+    # earliest such key wins. Both directions are indexed up front so each
+    # lookup is a few dict probes instead of a scan over every key.
+    keys = list(mapping)
+    positions = {key: position for position, key in enumerate(keys)}
+    suffix_positions: Dict[str, int] = {}
+    for position, key in enumerate(keys):
+        parts = key.split(".")
+        for i in range(1, len(parts)):
+            suffix_positions.setdefault(".".join(parts[i:]), position)
 
-        layer_name = None
-        detailed = root.find(".//detailed")
-        if detailed is not None:
-            layer_name = detailed.get("Name") or _first_text(detailed.find("./enttyp/enttypl"))
+    def lookup(layer_name: str) -> Any:
+        value = mapping.get(layer_name)
+        if value is not None or not layer_name:
+            return value
 
-        if not layer_name:
-            layer_name = _first_text(root.find(".//dataIdInfo/idCitation/resTitle"))
-        if not layer_name:
-            layer_name = _first_text(root.find(".//idinfo/citation/citeinfo/title"))
+        best = suffix_positions.get(layer_name)
+        parts = layer_name.split(".")
+        for i in range(1, len(parts)):
+            position = positions.get(".".join(parts[i:]))
+            if position is not None and (best is None or position < best):
+                best = position
+        return mapping[keys[best]] if best is not None else None
 
-        if not layer_name:
-            continue
-
-        topics: List[str] = []
-        for node in root.findall(".//dataIdInfo/tpCat"):
-            value = _first_text(node)
-            if value:
-                topics.append(value)
-        for node in root.findall(".//idinfo/keywords/theme/themekey"):
-            value = _first_text(node)
-            if value and value.lower() in (
-                "farming",
-                "biota",
-                "boundaries",
-                "climatology/meteorology/atmosphere",
-                "economy",
-                "elevation",
-                "environment",
-                "geoscientificinformation",
-                "health",
-                "imagerybasemapsearthcover",
-                "intelligencemilitary",
-                "inlandwaters",
-                "location",
-                "oceans",
-                "planningcadastre",
-                "society",
-                "structure",
-                "transportation",
-                "utilitiescommunication",
-            ):
-                topics.append(value)
-
-        if topics:
-            uniq = []
-            for item in topics:
-                if item not in uniq:
-                    uniq.append(item)
-            layer_themes[layer_name] = " | ".join(uniq)
-
-    return layer_themes
+    return lookup
 
 
 def _srs_to_dict(srs) -> Optional[Dict[str, Any]]:
@@ -341,9 +479,7 @@ def _geom_type_name(layer_def) -> str:
     except Exception:
         pass
 
-    try:
-        from osgeo import ogr  # type: ignore
-    except Exception:
+    if ogr is None:
         return str(layer_def.GetGeomType())
 
     try:
@@ -352,24 +488,46 @@ def _geom_type_name(layer_def) -> str:
         return str(layer_def.GetGeomType())
 
 
-def _layer_to_dict(layer) -> Dict[str, Any]:
+def _layer_extent(layer, exact_extent: bool = False) -> Optional[Tuple[float, float, float, float]]:
+    # Use the extent cached in the layer header; scanning every feature for
+    # it is opt-in.
+    try:
+        extent = layer.GetExtent(force=False, can_return_null=True)
+    except Exception:
+        extent = None
+    if extent is None and exact_extent:
+        try:
+            extent = layer.GetExtent(force=True)
+        except Exception:
+            extent = None
+    return extent
+
+
+def _layer_to_dict(
+    layer, exact_counts: bool = False, exact_extent: bool = False
+) -> Dict[str, Any]:
     layer_def = layer.GetLayerDefn()
 
+    # Without force the driver answers from the table header when it can and
+    # returns -1 otherwise; counting every feature is opt-in.
     try:
-        feature_count = layer.GetFeatureCount(True)
+        feature_count = layer.GetFeatureCount(False)
+        if feature_count == -1 and exact_counts:
+            feature_count = layer.GetFeatureCount(True)
+        if feature_count == -1:
+            feature_count = None
     except Exception:
         feature_count = None
 
-    try:
-        extent = layer.GetExtent()
+    extent = _layer_extent(layer, exact_extent=exact_extent)
+    extent_dict = None
+    if extent is not None:
         extent_dict = {
             "min_x": extent[0],
             "max_x": extent[1],
             "min_y": extent[2],
             "max_y": extent[3],
         }
-    except Exception:
-        extent_dict = None
 
     fields = [_field_def_to_dict(layer_def.GetFieldDefn(i)) for i in range(layer_def.GetFieldCount())]
 
@@ -380,7 +538,7 @@ def _layer_to_dict(layer) -> Dict[str, Any]:
         "geometry_type_name": _geom_type_name(layer_def),
         "feature_count": feature_count,
         "extent": extent_dict,
-        "extent_bbox": _layer_bounding_box(layer),
+        "extent_bbox": _layer_bounding_box(layer, extent=extent),
         "epsg": _layer_epsg(layer),
         "srs": _srs_to_dict(layer.GetSpatialRef()),
         "fields": fields,
@@ -390,12 +548,10 @@ def _layer_to_dict(layer) -> Dict[str, Any]:
 
 
 def _open_gdb(path: str):
-    try:
-        from osgeo import gdal, ogr  # type: ignore
-    except Exception as exc:
+    if gdal is None or ogr is None:
         raise SystemExit(
             "GDAL Python bindings not available. Install GDAL or ensure osgeo is on PYTHONPATH."
-        ) from exc
+        )
 
     gdal.UseExceptions()
     ogr.UseExceptions()
@@ -406,7 +562,12 @@ def _open_gdb(path: str):
 
     try:
         if hasattr(gdal, "OpenEx"):
-            ds = gdal.OpenEx(path, gdal.OF_VECTOR)
+            # Only OpenFileGDB can open a .gdb here, so skip probing other drivers.
+            ds = gdal.OpenEx(
+                path,
+                gdal.OF_VECTOR | gdal.OF_READONLY,
+                allowed_drivers=["OpenFileGDB"],
+            )
         else:
             ds = ogr.Open(path, 0)
     except Exception as exc:
@@ -425,15 +586,25 @@ def _format_crs_uri(crs_string: Optional[str]) -> Optional[str]:
     return crs_string
 
 
-def _layer_epsg(layer) -> Optional[str]:
-    srs = layer.GetSpatialRef()
-    if srs is None:
+def _srs_wkt(srs) -> Optional[str]:
+    try:
+        return srs.ExportToWkt() or None
+    except Exception:
         return None
 
+
+# Layers in a geodatabase usually share one or two coordinate systems, so the
+# EPSG lookup and the transformation to WGS84 are cached by SRS WKT.
+@lru_cache(maxsize=64)
+def _wkt_to_epsg(wkt: str) -> Optional[str]:
+    if osr is None:
+        return None
+
+    srs = osr.SpatialReference()
     try:
-        srs = srs.Clone()
+        srs.ImportFromWkt(wkt)
     except Exception:
-        pass
+        return None
 
     try:
         srs.AutoIdentifyEPSG()
@@ -451,55 +622,101 @@ def _layer_epsg(layer) -> Optional[str]:
     return None
 
 
-def _transform_bbox_to_wgs84(
-    bbox: Tuple[float, float, float, float], srs
-) -> Optional[Tuple[float, float, float, float]]:
-    try:
-        from osgeo import osr  # type: ignore
-    except Exception:
+def _traditional_axis_order(srs) -> None:
+    if hasattr(osr, "OAMS_TRADITIONAL_GIS_ORDER") and hasattr(srs, "SetAxisMappingStrategy"):
+        srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+
+
+@lru_cache(maxsize=1)
+def _wgs84_srs():
+    wgs84 = osr.SpatialReference()
+    wgs84.ImportFromEPSG(4326)
+    _traditional_axis_order(wgs84)
+    return wgs84
+
+
+@lru_cache(maxsize=64)
+def _transform_for_wkt(wkt: str):
+    srs = osr.SpatialReference()
+    srs.ImportFromWkt(wkt)
+    _traditional_axis_order(srs)
+    return osr.CoordinateTransformation(srs, _wgs84_srs())
+
+
+def _layer_epsg(layer) -> Optional[str]:
+    srs = layer.GetSpatialRef()
+    if srs is None:
         return None
 
-    try:
-        wgs84 = osr.SpatialReference()
-        wgs84.ImportFromEPSG(4326)
-        if hasattr(wgs84, "SetAxisMappingStrategy") and hasattr(
-            osr, "OAMS_TRADITIONAL_GIS_ORDER"
-        ):
-            wgs84.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
-        if hasattr(srs, "SetAxisMappingStrategy") and hasattr(
-            osr, "OAMS_TRADITIONAL_GIS_ORDER"
-        ):
-            srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
-        transform = osr.CoordinateTransformation(srs, wgs84)
-    except Exception:
+    wkt = _srs_wkt(srs)
+    if wkt is None:
         return None
+    return _wkt_to_epsg(wkt)
 
+
+def _densify_bbox_edges(
+    bbox: Tuple[float, float, float, float], points_per_edge: int = _BBOX_EDGE_POINTS
+) -> List[Tuple[float, float]]:
+    # Sample each edge of the (min_x, max_x, min_y, max_y) extent rather than
+    # only its corners; edges bow outward when reprojected between very
+    # different coordinate systems, so corners alone undersize the bbox.
     min_x, max_x, min_y, max_y = bbox
-    corners = [
-        (min_x, min_y),
-        (min_x, max_y),
-        (max_x, min_y),
-        (max_x, max_y),
+    steps = [i / points_per_edge for i in range(points_per_edge)]
+    points: List[Tuple[float, float]] = []
+    points.extend((min_x + (max_x - min_x) * t, min_y) for t in steps)
+    points.extend((max_x, min_y + (max_y - min_y) * t) for t in steps)
+    points.extend((max_x - (max_x - min_x) * t, max_y) for t in steps)
+    points.extend((min_x, max_y - (max_y - min_y) * t) for t in steps)
+    return points
+
+
+def _reduce_bbox(
+    points: Iterable[Tuple[float, ...]]
+) -> Optional[Tuple[float, float, float, float]]:
+    # Points outside the target CRS's domain come back as inf; ignore them.
+    finite = [
+        (pt[0], pt[1]) for pt in points if math.isfinite(pt[0]) and math.isfinite(pt[1])
     ]
+    if not finite:
+        return None
+    xs, ys = zip(*finite)
+    return (min(xs), min(ys), max(xs), max(ys))
 
-    try:
-        transformed = [transform.TransformPoint(x, y) for x, y in corners]
-    except Exception:
+
+def _transform_bbox_to_wgs84(
+    bbox: Tuple[float, float, float, float], srs
+) -> Optional[Tuple[float, float, float, float]]:
+    wkt = _srs_wkt(srs)
+    if wkt is None:
         return None
 
-    xs = [pt[0] for pt in transformed]
-    ys = [pt[1] for pt in transformed]
-    return (min(xs), min(ys), max(xs), max(ys))
+    with _TRANSFORM_LOCK:
+        try:
+            transform = _transform_for_wkt(wkt)
+        except Exception:
+            return None
 
+        try:
+            # One call into OSR for every sampled point instead of one per point.
+            transformed = transform.TransformPoints(_densify_bbox_edges(bbox))
+        except Exception:
+            return None
+
+    return _reduce_bbox(transformed)
 
-def _layer_bounding_box(layer, decimal_places: int = 4) -> str:
+
+def _layer_bounding_box(
+    layer,
+    decimal_places: int = 4,
+    extent: Optional[Tuple[float, float, float, float]] = None,
+) -> str:
     srs = layer.GetSpatialRef()
     if srs is None:
         return "Unknown"
 
-    try:
-        extent = layer.GetExtent()
-    except Exception:
+    if extent is None:
+        extent = _layer_extent(layer)
+    if extent is None:
         return "Unknown"
 
     bbox = (extent[0], extent[1], extent[2], extent[3])
@@ -518,23 +735,44 @@ def _layer_bounding_box(layer, decimal_places: int = 4) -> str:
     return f"{rounded[0]},{rounded[1]},{rounded[2]},{rounded[3]}"
 
 
+# Maps every ASCII character that is not alphanumeric, "-", "_" or "." to "_".
+_ASCII_FILENAME_TABLE = str.maketrans(
+    {
+        chr(i): "_"
+        for i in range(128)
+        if not (chr(i).isalnum() or chr(i) in ("-", "_", "."))
+    }
+)
+
+
 def _sanitize_filename(name: str) -> str:
     safe = name.replace(os.sep, "_")
+    if safe.isascii():
+        return safe.translate(_ASCII_FILENAME_TABLE)
     return "".join(ch if ch.isalnum() or ch in ("-", "_", ".") else "_" for ch in safe)
 
 
-def _generate_layer_id(length: int = 12, prefix: str = "") -> str:
-    alphabet = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    try:
-        from nanoid import generate  # type: ignore
+_ID_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# Random bytes at or above this are rejected so every character stays
+# equally likely (256 is not a multiple of the alphabet size).
+_ID_BYTE_LIMIT = 256 - 256 % len(_ID_ALPHABET)
 
-        return f"{prefix}{generate(alphabet, length)}"
-    except Exception:
-        import secrets
 
-        return f"{prefix}{''.join(secrets.choice(alphabet) for _ in range(length))}"
+def _generate_layer_id(length: int = 12, prefix: str = "") -> str:
+    if _nanoid_generate is not None:
+        return f"{prefix}{_nanoid_generate(_ID_ALPHABET, length)}"
+
+    chars: List[str] = []
+    while len(chars) < length:
+        chars.extend(
+            _ID_ALPHABET[byte % len(_ID_ALPHABET)]
+            for byte in secrets.token_bytes(2 * length)
+            if byte < _ID_BYTE_LIMIT
+        )
+    return prefix + "".join(chars[:length])
 
 
+@lru_cache(maxsize=32)
 def _resource_type(geom_name: Optional[str]) -> str:
     if not geom_name:
         return "Unknown"
@@ -544,98 +782,118 @@ def _resource_type(geom_name: Optional[str]) -> str:
     return f"{' '.join(parts)} data"
 
 
-def _write_layer_csv(path: str, inventory: List[Dict[str, Any]]) -> None:
-    fieldnames = [
-        "ID",
-        "name",
-        "Description",
-        "Rights",
-        "Theme",
-        "geometry_type",
-        "geometry_type_name",
-        "Resource Type",
-        "feature_count",
-        "Bounding Box",
-        "Coordinate Reference System",
-    ]
-    with open(path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for item in inventory:
-            writer.writerow(
-                {
-                    "ID": item.get("id"),
-                    "name": item.get("name"),
-                    "Description": item.get("description"),
-                    "Rights": item.get("rights"),
-                    "Theme": item.get("theme"),
-                    "geometry_type": item.get("geometry_type"),
-                    "geometry_type_name": item.get("geometry_type_name"),
-                    "Resource Type": _resource_type(item.get("geometry_type_name")),
-                    "feature_count": item.get("feature_count"),
-                    "Bounding Box": item.get("extent_bbox"),
-                    "Coordinate Reference System": _format_crs_uri(item.get("epsg")),
-                }
-            )
+_LAYER_CSV_FIELDNAMES = [
+    "ID",
+    "name",
+    "Description",
+    "Rights",
+    "Theme",
+    "geometry_type",
+    "geometry_type_name",
+    "Resource Type",
+    "feature_count",
+    "Bounding Box",
+    "Coordinate Reference System",
+]
+
+_FIELD_CSV_FIELDNAMES = [
+    "friendlier_id",
+    "field_name",
+    "field_type",
+    # "width",
+    # "precision",
+    # "nullable",
+    # "default",
+    "values",
+    # "alias",
+    "definition",
+    "definition_source",
+    "domain_description",
+    "parent_field_name",
+    "position"
+]
+
+
+def _layer_csv_row(item: Dict[str, Any]) -> Tuple[Any, ...]:
+    # Values in _LAYER_CSV_FIELDNAMES order.
+    return (
+        item.get("id"),
+        item.get("name"),
+        item.get("description"),
+        item.get("rights"),
+        item.get("theme"),
+        item.get("geometry_type"),
+        item.get("geometry_type_name"),
+        _resource_type(item.get("geometry_type_name")),
+        item.get("feature_count"),
+        item.get("extent_bbox"),
+        _format_crs_uri(item.get("epsg")),
+    )
 
 
-def _write_field_csvs(directory: str, inventory: List[Dict[str, Any]]) -> None:
-    os.makedirs(directory, exist_ok=True)
-    fieldnames = [
-        "friendlier_id",
-        "field_name",
-        "field_type",
-        # "width",
-        # "precision",
-        # "nullable",
-        # "default",
-        "values",
-        # "alias",
-        "definition",
-        "definition_source",
-        "domain_description",
-        "parent_field_name",
-        "position"
-    ]
-    for item in inventory:
-        layer_name = item.get("name") or "layer"
-        layer_id = item.get("id") or ""
-        filename = _sanitize_filename(layer_name) + ".csv"
-        path = os.path.join(directory, filename)
-        with open(path, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for field in item.get("fields") or []:
-                alias = field.get("alias") or ""
-                field_name = field.get("name") or ""
-                if alias and field_name and alias == field_name:
-                    alias = ""
-                definition = field.get("description") or ""
-                if alias and definition:
-                    definition = f"{alias}. {definition}"
-                elif alias and not definition:
-                    definition = alias
-                writer.writerow(
-                    {
-                        "friendlier_id": layer_id,
-                        "field_name": field.get("name"),
-                        "field_type": field.get("type"),
-                        "definition": definition,
-                        "definition_source": field.get("definition_source"),
-                        # "width": field.get("width"),
-                        # "precision": field.get("precision"),
-                        # "nullable": field.get("nullable"),
-                        # "default": field.get("default"),
-                        "values": field.get("domain"),
-                        # "alias": field.get("alias"),
-                        "domain_description": field.get("domain_description"),
-                        "parent_field_name": "",
-                        "position": "",
-                    }
-                )
+def _field_csv_row(layer_id: str, field: Dict[str, Any]) -> Tuple[Any, ...]:
+    alias = field.get("alias") or ""
+    field_name = field.get("name") or ""
+    if alias and field_name and alias == field_name:
+        alias = ""
+    definition = field.get("description") or ""
+    if alias and definition:
+        definition = f"{alias}. {definition}"
+    elif alias and not definition:
+        definition = alias
+    # Values in _FIELD_CSV_FIELDNAMES order.
+    return (
+        layer_id,
+        field.get("name"),
+        field.get("type"),
+        # field.get("width"),
+        # field.get("precision"),
+        # field.get("nullable"),
+        # field.get("default"),
+        field.get("domain"),
+        # field.get("alias"),
+        definition,
+        field.get("definition_source"),
+        field.get("domain_description"),
+        "",
+        "",
+    )
+
+
+def _write_layer_field_csv(directory: str, item: Dict[str, Any]) -> None:
+    layer_name = item.get("name") or "layer"
+    layer_id = item.get("id") or ""
+    filename = _sanitize_filename(layer_name) + ".csv"
+    path = os.path.join(directory, filename)
+    with open(path, "w", encoding="utf-8", newline="", buffering=_WRITE_BUFFER_SIZE) as f:
+        writer = csv.writer(f)
+        writer.writerow(_FIELD_CSV_FIELDNAMES)
+        writer.writerows(_field_csv_row(layer_id, field) for field in item.get("fields") or [])
 
 
-def _print_table(inventory: List[Dict[str, Any]]) -> None:
+def _write_json(path: str, inventory: Iterable[Dict[str, Any]]) -> None:
+    try:
+        import orjson  # type: ignore
+    except Exception:
+        orjson = None
+
+    if orjson is None:
+        with open(path, "w", encoding="utf-8", buffering=_WRITE_BUFFER_SIZE) as f:
+            json.dump(list(inventory), f, indent=2, ensure_ascii=False)
+        return
+
+    # orjson serializes each layer in C; writing them one at a time avoids
+    # building the whole indented document in memory.
+    with open(path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+        f.write(b"[\n")
+        for index, layer_info in enumerate(inventory):
+            if index:
+                f.write(b",\n")
+            f.write(orjson.dumps(layer_info, option=orjson.OPT_INDENT_2))
+        f.write(b"\n]\n")
+
+
+def _print_table(inventory: Iterable[Dict[str, Any]]) -> None:
     headers = ["feature_class", "geom", "features", "fields"]
     rows: List[List[str]] = []
 
@@ -654,13 +912,117 @@ def _print_table(inventory: List[Dict[str, Any]]) -> None:
         for i, cell in enumerate(row):
             widths[i] = max(widths[i], len(cell))
 
-    def fmt_row(values: List[str]) -> str:
-        return "  ".join(values[i].ljust(widths[i]) for i in range(len(values)))
+    fmt = "  ".join(f"{{:<{w}}}" for w in widths)
+    lines = [fmt.format(*headers), fmt.format(*("-" * w for w in widths))]
+    lines.extend(fmt.format(*row) for row in rows)
+    sys.stdout.write("\n".join(lines) + "\n")
 
-    print(fmt_row(headers))
-    print(fmt_row(["-" * w for w in widths]))
-    for row in rows:
-        print(fmt_row(row))
+
+def _thread_layer_to_dict(
+    gdb_path: str, index: int, exact_counts: bool, exact_extent: bool
+) -> Optional[Dict[str, Any]]:
+    ds = getattr(_thread_datasets, "ds", None)
+    if ds is None:
+        ds = _thread_datasets.ds = _open_gdb(gdb_path)
+    layer = ds.GetLayerByIndex(index)
+    if layer is None:
+        return None
+    return _layer_to_dict(layer, exact_counts=exact_counts, exact_extent=exact_extent)
+
+
+def _read_layers(
+    ds, gdb_path: Optional[str], exact_counts: bool, exact_extent: bool
+) -> Iterator[Optional[Dict[str, Any]]]:
+    layer_count = ds.GetLayerCount()
+
+    # Header reads are cheap, so only the opt-in feature scans are spread
+    # over threads. Results still come back in layer order.
+    if (exact_counts or exact_extent) and gdb_path and layer_count >= _MIN_PARALLEL_LAYERS:
+        read_layer = partial(
+            _thread_layer_to_dict,
+            gdb_path,
+            exact_counts=exact_counts,
+            exact_extent=exact_extent,
+        )
+        max_workers = min(os.cpu_count() or 1, layer_count)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            yield from executor.map(read_layer, range(layer_count))
+        return
+
+    for i in range(layer_count):
+        layer = ds.GetLayerByIndex(i)
+        if layer is None:
+            yield None
+            continue
+        yield _layer_to_dict(layer, exact_counts=exact_counts, exact_extent=exact_extent)
+
+
+def _iter_layers(
+    ds,
+    xml_texts: List[str],
+    exact_counts: bool = False,
+    exact_extent: bool = False,
+    gdb_path: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    xml_layers = _xml_layer_metadata(xml_texts)
+
+    # Each value is matched to layer names on its own, so a layer picks up
+    # e.g. its description from whichever qualified name carries one.
+    def lookup_for(key: str) -> Callable[[str], Any]:
+        return _layer_lookup(
+            {name: entry[key] for name, entry in xml_layers.items() if key in entry}
+        )
+
+    find_layer_meta = lookup_for("attrs")
+    find_layer_desc = lookup_for("description")
+    find_layer_rights = lookup_for("rights")
+    find_layer_theme = lookup_for("theme")
+
+    for layer_info in _read_layers(ds, gdb_path, exact_counts, exact_extent):
+        if layer_info is None:
+            continue
+
+        # Geodatabases without FGDC metadata skip the lookups and merge.
+        if xml_texts:
+            layer_name = layer_info.get("name") or ""
+            layer_meta = find_layer_meta(layer_name)
+            layer_desc = find_layer_desc(layer_name)
+            layer_rights = find_layer_rights(layer_name)
+            layer_theme = find_layer_theme(layer_name)
+
+            if layer_desc:
+                layer_info["description"] = layer_desc
+            if layer_rights:
+                layer_info["rights"] = layer_rights
+            if layer_theme:
+                layer_info["theme"] = layer_theme
+
+            if layer_meta:
+                for field in layer_info.get("fields") or []:
+                    field_name = field.get("name")
+                    if not field_name:
+                        continue
+                    meta = layer_meta.get(field_name)
+                    if not meta:
+                        continue
+                    # XML values only fill keys the field left empty.
+                    field.update(
+                        {key: value for key, value in meta.items() if not field.get(key)}
+                    )
+
+        yield layer_info
+
+
+def _write_csv_rows_as_read(
+    layers: Iterable[Dict[str, Any]], layer_writer, fields_dir: Optional[str]
+) -> Iterator[Dict[str, Any]]:
+    # Write each layer's inventory row and field CSV, then pass it on.
+    for layer_info in layers:
+        if layer_writer is not None:
+            layer_writer.writerow(_layer_csv_row(layer_info))
+        if fields_dir:
+            _write_layer_field_csv(fields_dir, layer_info)
+        yield layer_info
 
 
 def main() -> int:
@@ -674,6 +1036,16 @@ def main() -> int:
         dest="fields_dir",
         help="Write one CSV per layer for field definitions",
     )
+    parser.add_argument(
+        "--exact-counts",
+        action="store_true",
+        help="Count features by scanning layers whose header has no feature count",
+    )
+    parser.add_argument(
+        "--exact-extent",
+        action="store_true",
+        help="Compute extents by scanning layers whose header has no extent",
+    )
     parser.add_argument(
         "--no-inventory",
         action="store_true",
@@ -698,81 +1070,58 @@ def main() -> int:
 
     ds = _open_gdb(gdb_path)
     xml_texts = _extract_metadata_xml_from_gdb(gdb_path)
-    xml_map = _xml_attribute_map(xml_texts)
-    xml_layer_desc = _xml_layer_descriptions(xml_texts)
-    xml_layer_rights = _xml_layer_rights(xml_texts)
-    xml_layer_themes = _xml_layer_themes(xml_texts)
-
-    inventory: List[Dict[str, Any]] = []
-    for i in range(ds.GetLayerCount()):
-        layer = ds.GetLayerByIndex(i)
-        if layer is None:
-            continue
-        layer_info = _layer_to_dict(layer)
-
-        layer_name = layer_info.get("name") or ""
-        layer_meta = xml_map.get(layer_name)
-        if layer_meta is None and layer_name:
-            for key, value in xml_map.items():
-                if key.endswith(f".{layer_name}") or layer_name.endswith(f".{key}"):
-                    layer_meta = value
-                    break
-        layer_desc = xml_layer_desc.get(layer_name)
-        if layer_desc is None and layer_name:
-            for key, value in xml_layer_desc.items():
-                if key.endswith(f".{layer_name}") or layer_name.endswith(f".{key}"):
-                    layer_desc = value
-                    break
-        layer_rights = xml_layer_rights.get(layer_name)
-        if layer_rights is None and layer_name:
-            for key, value in xml_layer_rights.items():
-                if key.endswith(f".{layer_name}") or layer_name.endswith(f".{key}"):
-                    layer_rights = value
-                    break
-        layer_theme = xml_layer_themes.get(layer_name)
-        if layer_theme is None and layer_name:
-            for key, value in xml_layer_themes.items():
-                if key.endswith(f".{layer_name}") or layer_name.endswith(f".{key}"):
-                    layer_theme = value
-                    break
-
-        if layer_desc:
-            layer_info["description"] = layer_desc
-        if layer_rights:
-            layer_info["rights"] = layer_rights
-        if layer_theme:
-            layer_info["theme"] = layer_theme
-
-        if layer_meta:
-            for field in layer_info.get("fields") or []:
-                field_name = field.get("name")
-                if not field_name:
-                    continue
-                meta = layer_meta.get(field_name)
-                if not meta:
-                    continue
-                for key, value in meta.items():
-                    if key not in field or not field.get(key):
-                        field[key] = value
-
-        inventory.append(layer_info)
-
-    if args.json_path:
-        with open(args.json_path, "w", encoding="utf-8") as f:
-            json.dump(inventory, f, indent=2, ensure_ascii=False)
 
+    layer_csv_path = None
     if args.csv_path:
-        _write_layer_csv(args.csv_path, inventory)
+        layer_csv_path = args.csv_path
     elif run_inventory:
-        _write_layer_csv(os.path.join(out_dir, "layers.csv"), inventory)
+        layer_csv_path = os.path.join(out_dir, "layers.csv")
 
+    fields_dir = None
     if args.fields_dir:
-        _write_field_csvs(args.fields_dir, inventory)
+        fields_dir = args.fields_dir
     elif run_fields:
-        _write_field_csvs(os.path.join(out_dir, "fields"), inventory)
-
-    if not args.json_path and not args.csv_path and not args.fields_dir and not run_inventory and not run_fields:
-        _print_table(inventory)
+        fields_dir = os.path.join(out_dir, "fields")
+    if fields_dir:
+        os.makedirs(fields_dir, exist_ok=True)
+
+    # Layers are read lazily and each output consumes them as they arrive,
+    # so no step holds the whole inventory unless it has to.
+    print_table = not args.json_path and not layer_csv_path and not fields_dir
+
+    with contextlib.ExitStack() as stack:
+        layer_writer = None
+        if layer_csv_path:
+            layer_file = stack.enter_context(
+                open(
+                    layer_csv_path,
+                    "w",
+                    encoding="utf-8",
+                    newline="",
+                    buffering=_WRITE_BUFFER_SIZE,
+                )
+            )
+            layer_writer = csv.writer(layer_file)
+            layer_writer.writerow(_LAYER_CSV_FIELDNAMES)
+
+        layers = _write_csv_rows_as_read(
+            _iter_layers(
+                ds,
+                xml_texts,
+                exact_counts=args.exact_counts,
+                exact_extent=args.exact_extent,
+                gdb_path=gdb_path,
+            ),
+            layer_writer,
+            fields_dir,
+        )
+        if args.json_path:
+            _write_json(args.json_path, layers)
+        elif print_table:
+            _print_table(layers)
+        else:
+            for _ in layers:
+                pass
 
     return 0
 
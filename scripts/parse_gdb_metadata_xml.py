@@ -12,8 +12,34 @@ from __future__ import annotations
 import argparse
 import csv
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Any, Dict, Iterable, List, Optional, Tuple
-from xml.etree import ElementTree as ET
+
+from lxml import etree
+
+# Metadata blobs can be large, so lift libxml2's default size limits, as the
+# stdlib parser never had them. Comments and processing instructions are
+# dropped as ElementTree did, so they cannot split an element's .text.
+_XML_PARSER = etree.XMLParser(huge_tree=True, remove_comments=True, remove_pis=True)
+
+# The XML arrives already decoded, so a declared encoding must not be
+# applied a second time (ElementTree ignored it for str input too).
+_XML_DECLARATION_RE = re.compile(r"^<\?xml[^>]*\?>")
+
+_ATTRLABL_XP = etree.XPath("./attrlabl")
+_ATTRDEF_XP = etree.XPath("./attrdef")
+_ATTRDESCR_XP = etree.XPath("./attrdescr")
+_ATTRDEFS_XP = etree.XPath("./attrdefs")
+
+# Below this many layers they are read on the main dataset without a pool.
+_MIN_PARALLEL_LAYERS = 4
+
+# Worker threads each open their own dataset; GDAL datasets must not be used
+# from two threads at once.
+_thread_datasets = threading.local()
 
 
 def _open_gdb(path: str):
@@ -33,7 +59,12 @@ def _open_gdb(path: str):
 
     try:
         if hasattr(gdal, "OpenEx"):
-            ds = gdal.OpenEx(path, gdal.OF_VECTOR)
+            # Only OpenFileGDB can open a .gdb here, so skip probing other drivers.
+            ds = gdal.OpenEx(
+                path,
+                gdal.OF_VECTOR | gdal.OF_READONLY,
+                allowed_drivers=["OpenFileGDB"],
+            )
         else:
             ds = ogr.Open(path, 0)
     except Exception as exc:
@@ -45,8 +76,21 @@ def _open_gdb(path: str):
     return ds
 
 
+# ASCII names are sanitized in one str.translate call; only names with other
+# characters need the per-character isalnum() check.
+_ASCII_FILENAME_TABLE = str.maketrans(
+    {
+        chr(i): "_"
+        for i in range(128)
+        if not (chr(i).isalnum() or chr(i) in ("-", "_", "."))
+    }
+)
+
+
 def _sanitize_filename(name: str) -> str:
     safe = name.replace(os.sep, "_")
+    if safe.isascii():
+        return safe.translate(_ASCII_FILENAME_TABLE)
     return "".join(ch if ch.isalnum() or ch in ("-", "_", ".") else "_" for ch in safe)
 
 
@@ -81,11 +125,19 @@ def _field_def_to_dict(field_def) -> Dict[str, Any]:
 
 def _get_xml_strings(layer) -> List[Tuple[str, str]]:
     xml_strings: List[Tuple[str, str]] = []
-    domains = layer.GetMetadataDomainList() or []
+    # Layer XML lives in the xml:* domains (OpenFileGDB reports
+    # xml:documentation and xml:definition) or the default domain; other
+    # domains are not fetched at all.
+    domains = [
+        domain
+        for domain in layer.GetMetadataDomainList() or []
+        if domain == "" or domain.startswith("xml:")
+    ]
     if not domains:
         return xml_strings
 
-    for domain in domains:
+    # Fetch each domain once even if the driver lists it more than once.
+    for domain in dict.fromkeys(domains):
         try:
             md = layer.GetMetadata(domain)
         except Exception:
@@ -105,53 +157,33 @@ def _get_xml_strings(layer) -> List[Tuple[str, str]]:
     return xml_strings
 
 
-def _first_text(element: Optional[ET.Element]) -> Optional[str]:
-    if element is None:
+def _first_match_text(xpath, element) -> Optional[str]:
+    matches = xpath(element)
+    if not matches:
         return None
-    text = (element.text or "").strip()
-    return text or None
+    return (matches[0].text or "").strip() or None
 
 
-def _extract_fgdc_attributes(xml_text: str) -> Dict[str, Dict[str, str]]:
+def _parse_xml(xml_text: str):
     try:
-        root = ET.fromstring(xml_text)
-    except ET.ParseError:
-        return {}
-
-    attr_info: Dict[str, Dict[str, str]] = {}
-
-    # FGDC attribute section: eainfo/detailed/attr
-    for attr in root.findall(".//attr"):
-        label = _first_text(attr.find("./attrlabl"))
-        if not label:
-            continue
-        description = _first_text(attr.find("./attrdef"))
-        source = _first_text(attr.find("./attrdefs"))
-        attr_info[label] = {}
-        if description:
-            attr_info[label]["description"] = description
-        if source:
-            attr_info[label]["definition_source"] = source
-
-    return attr_info
-
+        return etree.fromstring(_XML_DECLARATION_RE.sub("", xml_text, count=1), _XML_PARSER)
+    except etree.XMLSyntaxError:
+        return None
 
-def _extract_esri_attributes(xml_text: str) -> Dict[str, Dict[str, str]]:
-    try:
-        root = ET.fromstring(xml_text)
-    except ET.ParseError:
-        return {}
 
+def _extract_attributes(root) -> Dict[str, Dict[str, str]]:
     attr_info: Dict[str, Dict[str, str]] = {}
 
-    # ESRI metadata variants often store field info under eainfo/detailed/attr,
-    # but some store under eainfo/overview or dataIdInfo. We'll try attr nodes first.
-    for attr in root.findall(".//attr"):
-        label = _first_text(attr.find("./attrlabl"))
+    # FGDC attribute section: eainfo/detailed/attr. ESRI metadata variants use
+    # the same nodes but may describe the field in attrdescr instead of attrdef.
+    for attr in root.iterdescendants("attr"):
+        label = _first_match_text(_ATTRLABL_XP, attr)
         if not label:
             continue
-        description = _first_text(attr.find("./attrdef")) or _first_text(attr.find("./attrdescr"))
-        source = _first_text(attr.find("./attrdefs"))
+        description = (
+            _first_match_text(_ATTRDEF_XP, attr) or _first_match_text(_ATTRDESCR_XP, attr)
+        )
+        source = _first_match_text(_ATTRDEFS_XP, attr)
         attr_info[label] = {}
         if description:
             attr_info[label]["description"] = description
@@ -176,30 +208,83 @@ def _attribute_metadata(layer) -> Tuple[Dict[str, Dict[str, str]], List[str]]:
     domains_used: List[str] = []
     for domain, xml_text in _get_xml_strings(layer):
         domains_used.append(domain)
-        _merge_attr_info(attr_info, _extract_fgdc_attributes(xml_text))
-        _merge_attr_info(attr_info, _extract_esri_attributes(xml_text))
+        # Without an attribute label there is nothing to extract, and a
+        # substring test is far cheaper than parsing the XML.
+        if "<attrlabl" not in xml_text:
+            continue
+        root = _parse_xml(xml_text)
+        if root is None:
+            continue
+        _merge_attr_info(attr_info, _extract_attributes(root))
     return attr_info, sorted(set(domains_used))
 
 
+_FIELD_CSV_FIELDNAMES = (
+    "name",
+    "type",
+    "width",
+    "precision",
+    "nullable",
+    "default",
+    "domain",
+    "alias",
+    "description",
+    "definition_source",
+    "metadata_domains",
+)
+
+# Field CSVs are written through 1 MiB buffers rather than the 8 KiB default.
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
 def _write_field_csv(path: str, fields: List[Dict[str, Any]]) -> None:
-    fieldnames = [
-        "name",
-        "type",
-        "width",
-        "precision",
-        "nullable",
-        "default",
-        "domain",
-        "alias",
-        "description",
-        "definition_source",
-        "metadata_domains",
-    ]
-    with open(path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for field in fields:
-            writer.writerow({key: field.get(key) for key in fieldnames})
+    with open(path, "w", encoding="utf-8", newline="", buffering=_WRITE_BUFFER_SIZE) as f:
+        writer = csv.writer(f)
+        writer.writerow(_FIELD_CSV_FIELDNAMES)
+        writer.writerows([field.get(key) for key in _FIELD_CSV_FIELDNAMES] for field in fields)
+
+
+def _layer_fields(layer) -> Tuple[str, List[Dict[str, Any]]]:
+    layer_def = layer.GetLayerDefn()
+    fields = [_field_def_to_dict(layer_def.GetFieldDefn(j)) for j in range(layer_def.GetFieldCount())]
+
+    attr_info, domains_used = _attribute_metadata(layer)
+    for field in fields:
+        name = field.get("name")
+        if not name:
+            continue
+        meta = attr_info.get(name, {})
+        if meta:
+            field.update(meta)
+        field["metadata_domains"] = ";".join(domains_used) if domains_used else ""
+
+    return layer.GetName() or "layer", fields
+
+
+def _thread_layer_fields(gdb_path: str, index: int) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+    ds = getattr(_thread_datasets, "ds", None)
+    if ds is None:
+        ds = _thread_datasets.ds = _open_gdb(gdb_path)
+    layer = ds.GetLayerByIndex(index)
+    if layer is None:
+        return None
+    return _layer_fields(layer)
+
+
+def _read_layers(ds, gdb_path: str) -> Iterable[Optional[Tuple[str, List[Dict[str, Any]]]]]:
+    layer_count = ds.GetLayerCount()
+
+    # Layers are read and their XML parsed on worker threads; results come
+    # back in layer order so CSVs are written exactly as in a serial run.
+    if layer_count >= _MIN_PARALLEL_LAYERS:
+        max_workers = min(8, os.cpu_count() or 1, layer_count)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            yield from executor.map(partial(_thread_layer_fields, gdb_path), range(layer_count))
+        return
+
+    for i in range(layer_count):
+        layer = ds.GetLayerByIndex(i)
+        yield None if layer is None else _layer_fields(layer)
 
 
 def main() -> int:
@@ -213,25 +298,12 @@ def main() -> int:
     ds = _open_gdb(args.gdb)
     os.makedirs(args.out_dir, exist_ok=True)
 
-    for i in range(ds.GetLayerCount()):
-        layer = ds.GetLayerByIndex(i)
-        if layer is None:
+    for result in _read_layers(ds, args.gdb):
+        if result is None:
             continue
 
-        layer_def = layer.GetLayerDefn()
-        fields = [_field_def_to_dict(layer_def.GetFieldDefn(j)) for j in range(layer_def.GetFieldCount())]
-
-        attr_info, domains_used = _attribute_metadata(layer)
-        for field in fields:
-            name = field.get("name")
-            if not name:
-                continue
-            meta = attr_info.get(name, {})
-            if meta:
-                field.update(meta)
-            field["metadata_domains"] = ";".join(domains_used) if domains_used else ""
-
-        filename = _sanitize_filename(layer.GetName() or "layer") + ".csv"
+        layer_name, fields = result
+        filename = _sanitize_filename(layer_name) + ".csv"
         path = os.path.join(args.out_dir, filename)
         _write_field_csv(path, fields)
 
@@ -16,18 +16,33 @@ import csv
 import os
 import shutil
 import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 
-def table_exists(conn: sqlite3.Connection, name: str) -> bool:
-    cur = conn.execute(
-        "SELECT 1 FROM sqlite_master WHERE type IN ('table','view') AND name = ? LIMIT 1",
-        (name,),
-    )
-    return cur.fetchone() is not None
+def quote_identifier(name: str) -> str:
+    """
+    Quote a table name for SQL, doubling any embedded double quotes.
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def rename_table_sql(old_table: str, new_table: str) -> str:
+    return f"ALTER TABLE {quote_identifier(old_table)} RENAME TO {quote_identifier(new_table)}"
 
 
-def rename_spatial_index_if_present(conn: sqlite3.Connection, old_table: str, new_table: str) -> None:
+def table_names(conn: sqlite3.Connection) -> set[str]:
+    """
+    Return the names of all tables and views, so existence checks are set lookups
+    rather than one sqlite_master query each.
+    """
+    cur = conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table','view')")
+    return {row[0] for row in cur}
+
+
+def rename_spatial_index_if_present(
+    conn: sqlite3.Connection, old_table: str, new_table: str, names: set[str]
+) -> None:
     """
     If a GeoPackage has an RTree spatial index, it typically creates tables like:
       rtree_<table>_<geomcol>
@@ -35,7 +50,7 @@ def rename_spatial_index_if_present(conn: sqlite3.Connection, old_table: str, ne
       rtree_<table>_<geomcol>_parent
       rtree_<table>_<geomcol>_rowid
 
-    We rename those too when present.
+    We rename those too when present. `names` is kept up to date with the renames.
     """
     cur = conn.execute(
         "SELECT column_name FROM gpkg_geometry_columns WHERE table_name = ?",
@@ -53,41 +68,38 @@ def rename_spatial_index_if_present(conn: sqlite3.Connection, old_table: str, ne
     for sfx in suffixes:
         old_rtree = old_prefix + sfx
         new_rtree = new_prefix + sfx
-        if table_exists(conn, old_rtree) and not table_exists(conn, new_rtree):
-            conn.execute(f'ALTER TABLE "{old_rtree}" RENAME TO "{new_rtree}"')
+        if old_rtree in names and new_rtree not in names:
+            conn.execute(rename_table_sql(old_rtree, new_rtree))
+            # Renaming the rtree virtual table also renames its shadow tables.
+            names.clear()
+            names.update(table_names(conn))
 
 
-def rename_gpkg_internal_tables(conn: sqlite3.Connection, old_table: str, new_table: str) -> None:
-    """
-    Update core GeoPackage tables (and a couple common optional ones) that store the table name.
-    """
+# GeoPackage tables that store the feature table name, and whether each one is
+# optional in the spec (and so must be checked for before updating).
+GPKG_TABLE_NAME_REFERENCES = (
     # Core / common
-    conn.execute(
-        "UPDATE gpkg_contents SET table_name = ? WHERE table_name = ?",
-        (new_table, old_table),
-    )
-    conn.execute(
-        "UPDATE gpkg_geometry_columns SET table_name = ? WHERE table_name = ?",
-        (new_table, old_table),
-    )
-
+    ("gpkg_contents", False),
+    ("gpkg_geometry_columns", False),
     # If you’re using gpkg_metadata, references may point at the old table name
-    # (this table is optional in the spec, so guard it)
-    if table_exists(conn, "gpkg_metadata_reference"):
-        conn.execute(
-            "UPDATE gpkg_metadata_reference SET table_name = ? WHERE table_name = ?",
-            (new_table, old_table),
-        )
-
+    ("gpkg_metadata_reference", True),
     # Optional tables some tools create/use
-    if table_exists(conn, "gpkg_data_columns"):
-        conn.execute(
-            "UPDATE gpkg_data_columns SET table_name = ? WHERE table_name = ?",
-            (new_table, old_table),
-        )
-    if table_exists(conn, "gpkg_extensions"):
+    ("gpkg_data_columns", True),
+    ("gpkg_extensions", True),
+)
+
+
+def rename_gpkg_internal_tables(
+    conn: sqlite3.Connection, old_table: str, new_table: str, names: set[str]
+) -> None:
+    """
+    Update core GeoPackage tables (and a couple common optional ones) that store the table name.
+    """
+    for table, optional in GPKG_TABLE_NAME_REFERENCES:
+        if optional and table not in names:
+            continue
         conn.execute(
-            "UPDATE gpkg_extensions SET table_name = ? WHERE table_name = ?",
+            f"UPDATE {table} SET table_name = ? WHERE table_name = ?",
             (new_table, old_table),
         )
 
@@ -111,22 +123,50 @@ def rename_single_feature_table(conn: sqlite3.Connection, new_table: str) -> tup
     if old_table == new_table:
         return old_table, new_table
 
-    if table_exists(conn, new_table):
+    names = table_names(conn)
+    if new_table in names:
         raise RuntimeError(f"Target table name already exists inside gpkg: {new_table}")
 
     # Rename the feature table itself
-    conn.execute(f'ALTER TABLE "{old_table}" RENAME TO "{new_table}"')
+    conn.execute(rename_table_sql(old_table, new_table))
+    names.discard(old_table)
+    names.add(new_table)
 
     # Rename spatial index tables if present (RTree)
-    rename_spatial_index_if_present(conn, old_table, new_table)
+    rename_spatial_index_if_present(conn, old_table, new_table, names)
 
     # Update gpkg_* tables that reference it
-    rename_gpkg_internal_tables(conn, old_table, new_table)
+    rename_gpkg_internal_tables(conn, old_table, new_table, names)
 
     return old_table, new_table
 
 
-def process_one(gpkg_path: Path, new_base: str, make_backup: bool = True) -> Path:
+# Linux ioctl that clones a file's extents (fcntl.FICLONE from Python 3.12).
+FICLONE = 0x40049409
+
+
+def backup_file(src: Path, dst: Path, fast_backup: bool = False) -> None:
+    """
+    Copy src to dst. With fast_backup, first try a copy-on-write clone, which is
+    near-instant and writes no data on filesystems with reflinks (btrfs, XFS);
+    anywhere else this falls back to a regular copy.
+    """
+    if fast_backup:
+        try:
+            import fcntl
+
+            with src.open("rb") as fsrc, dst.open("wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), getattr(fcntl, "FICLONE", FICLONE), fsrc.fileno())
+            shutil.copystat(src, dst)
+            return
+        except (ImportError, OSError):
+            pass
+    shutil.copy2(src, dst)
+
+
+def process_one(
+    gpkg_path: Path, new_base: str, make_backup: bool = True, fast_backup: bool = False
+) -> Path:
     """
     Rename file to new_base.gpkg and rename internal feature table to new_base.
     Returns the new gpkg path.
@@ -139,7 +179,7 @@ def process_one(gpkg_path: Path, new_base: str, make_backup: bool = True) -> Pat
     # Backup first (highly recommended)
     if make_backup:
         backup_path = gpkg_path.with_suffix(gpkg_path.suffix + ".bak")
-        shutil.copy2(gpkg_path, backup_path)
+        backup_file(gpkg_path, backup_path, fast_backup=fast_backup)
 
     # Rename file on disk
     if gpkg_path.name != new_gpkg_path.name:
@@ -148,9 +188,20 @@ def process_one(gpkg_path: Path, new_base: str, make_backup: bool = True) -> Pat
         gpkg_path.rename(new_gpkg_path)
 
     # Rename table inside
-    conn = sqlite3.connect(str(new_gpkg_path))
+    # The transaction is managed with explicit BEGIN/COMMIT below, so turn off
+    # the sqlite3 module's own implicit transaction handling.
+    conn = sqlite3.connect(str(new_gpkg_path), isolation_level=None)
     try:
         conn.execute("PRAGMA foreign_keys = OFF")  # gpkg does not rely on FK constraints for this
+        if make_backup:
+            # The .bak copy is the recovery path, so skip the fsyncs and on-disk
+            # rollback journal for this short rename. WAL files are left alone
+            # because leaving WAL mode would persist in the file.
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("PRAGMA temp_store = MEMORY")
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            if journal_mode.lower() != "wal":
+                conn.execute("PRAGMA journal_mode = MEMORY")
         conn.execute("BEGIN")
         old_table, _ = rename_single_feature_table(conn, new_base)
         conn.execute("COMMIT")
@@ -177,6 +228,42 @@ def build_gpkg_lookup(gpkg_paths: list[Path]) -> dict[str, Path]:
     return lookup
 
 
+def resolve_gpkg_path(
+    old_base: str,
+    new_base: str,
+    gpkg_dir: Path | None,
+    gpkg_lookup: dict[str, Path] | None,
+) -> Path | None:
+    """
+    Return the gpkg to rename for a CSV row, or None if it was already renamed.
+    """
+    if gpkg_lookup is None:
+        gpkg_path = gpkg_dir / f"{old_base}.gpkg"
+        already_renamed_path = gpkg_dir / f"{new_base}.gpkg"
+        if not gpkg_path.exists() and already_renamed_path.exists():
+            return None
+        return gpkg_path
+
+    gpkg_path = gpkg_lookup.get(old_base)
+    if gpkg_path is None:
+        raise FileNotFoundError(f"No gpkg path provided for old_name '{old_base}'")
+    return gpkg_path
+
+
+def rows_are_independent(rows: list[tuple[str, str]]) -> bool:
+    """
+    True when no two rows share an old or new name, so they can run in any order.
+    Chained renames (a -> b, b -> c) must run in CSV order.
+    """
+    seen: set[str] = set()
+    for old_base, new_base in rows:
+        names = {old_base, new_base}
+        if seen & names:
+            return False
+        seen |= names
+    return True
+
+
 def main() -> None:
     csv_path = Path("rename_map_3.csv")  # change this if needed
 
@@ -193,6 +280,9 @@ def main() -> None:
         gpkg_lookup = None
         gpkg_dir = Path("30g-02/data")  # change this if you want to use a directory
 
+    # Clone backups instead of copying them on filesystems that support it
+    fast_backup = False
+
     processed = 0
     skipped = 0
     failed = 0
@@ -210,30 +300,52 @@ def main() -> None:
                 f"{missing}. Found headers: {reader.fieldnames} in {csv_path.resolve()}"
             )
 
+        rows: list[tuple[str, str]] = []
         for row in reader:
             row_normalized = {
                 (key or "").strip().lower(): (value or "")
                 for key, value in row.items()
             }
-            old_base = row_normalized["old_name"].strip()
-            new_base = row_normalized["new_name"].strip()
+            rows.append(
+                (row_normalized["old_name"].strip(), row_normalized["new_name"].strip())
+            )
 
+    # Each GeoPackage is its own SQLite file, so independent rows are renamed in
+    # parallel; results are still reported in CSV order.
+    if len(rows) > 1 and rows_are_independent(rows):
+        pending = []
+        with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(rows))) as executor:
+            for old_base, new_base in rows:
+                try:
+                    gpkg_path = resolve_gpkg_path(old_base, new_base, gpkg_dir, gpkg_lookup)
+                except Exception as exc:
+                    print(f"ERROR: {old_base} -> {new_base}: {exc}")
+                    failed += 1
+                    continue
+                if gpkg_path is None:
+                    print(f"SKIP already renamed: {old_base} -> {new_base}")
+                    skipped += 1
+                    continue
+                future = executor.submit(process_one, gpkg_path, new_base, True, fast_backup)
+                pending.append((old_base, new_base, future))
+
+            for old_base, new_base, future in pending:
+                try:
+                    future.result()
+                    processed += 1
+                except Exception as exc:
+                    print(f"ERROR: {old_base} -> {new_base}: {exc}")
+                    failed += 1
+    else:
+        for old_base, new_base in rows:
             try:
-                if gpkg_lookup is None:
-                    gpkg_path = gpkg_dir / f"{old_base}.gpkg"
-                    already_renamed_path = gpkg_dir / f"{new_base}.gpkg"
-                    if not gpkg_path.exists() and already_renamed_path.exists():
-                        print(f"SKIP already renamed: {old_base} -> {new_base}")
-                        skipped += 1
-                        continue
-                else:
-                    gpkg_path = gpkg_lookup.get(old_base)
-                    if gpkg_path is None:
-                        raise FileNotFoundError(
-                            f"No gpkg path provided for old_name '{old_base}'"
-                        )
-
-                process_one(gpkg_path, new_base, make_backup=True)
+                gpkg_path = resolve_gpkg_path(old_base, new_base, gpkg_dir, gpkg_lookup)
+                if gpkg_path is None:
+                    print(f"SKIP already renamed: {old_base} -> {new_base}")
+                    skipped += 1
+                    continue
+
+                process_one(gpkg_path, new_base, make_backup=True, fast_backup=fast_backup)
                 processed += 1
             except Exception as exc:
                 print(f"ERROR: {old_base} -> {new_base}: {exc}")